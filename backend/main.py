@@ -6,12 +6,13 @@ from pathlib import Path
 from time import perf_counter
 
 # Third Party Imports
+import yarl
 from omnitils.files import mkdir_full_perms
 from omnitils.logs import logger
 
 # Local Imports
 from managarr.utils._schema import MovieCollection, TVShow, TVEpisode
-from managarr.sources import identify_and_scrape
+from managarr.sources import identify_and_scrape, is_user_page, iter_theposterdb_user
 
 """
 * Scrape The Poster DB
@@ -136,22 +137,27 @@ if __name__ == "__main__":
         logger.info('Processing your request ...')
         start = perf_counter()
 
-        # Scrape from the appropriate source
-        _collection = identify_and_scrape(url)
-
-        # Movie collection
-        if isinstance(_collection, MovieCollection):
-            logger.info(f'Show processed: {_collection.title}')
-            export_movie_collection(
-                path=export_dir,
-                collection=_collection)
-
-        # TV Show
-        if isinstance(_collection, TVShow):
-            logger.info(f'Movie collection processed: {_collection.title}')
-            export_tv_show(
-                path=export_dir,
-                show=_collection)
+        # Scrape from the appropriate source, user pages list multiple sets
+        if is_user_page(yarl.URL(url)):
+            _collections = iter_theposterdb_user(url)
+        else:
+            _collections = [identify_and_scrape(url)]
+
+        for _collection in _collections:
+
+            # Movie collection
+            if isinstance(_collection, MovieCollection):
+                logger.info(f'Movie collection processed: {_collection.title}')
+                export_movie_collection(
+                    path=export_dir,
+                    collection=_collection)
+
+            # TV Show
+            if isinstance(_collection, TVShow):
+                logger.info(f'Show processed: {_collection.title}')
+                export_tv_show(
+                    path=export_dir,
+                    show=_collection)
 
         # Onto the next one
         elapsed = perf_counter() - start
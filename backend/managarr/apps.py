@@ -1,4 +1,5 @@
 # Standard Library Imports
+from importlib.util import find_spec
 from pathlib import Path
 
 # Third Party Imports
@@ -6,6 +7,7 @@ from django.apps import AppConfig
 
 # Local Imports
 from managarr import settings
+from managarr.sources.plex.snapshot import SnapshotCache
 
 
 class ManagarrConfig(AppConfig):
@@ -20,3 +22,9 @@ class ManagarrConfig(AppConfig):
     # Environment
     ENV = settings.ENV
     PlexAPI = settings.PLEX_API
+    PlexServers = settings.PLEX_SERVERS
+    PlexCache = SnapshotCache(
+        source=settings.PLEX_API if (
+            settings.ENV.get('PLEX_CACHE', {}).get('LISTENER', True) and find_spec('websocket')
+        ) else None,
+        ttl=settings.ENV.get('PLEX_CACHE', {}).get('TTL', 300))
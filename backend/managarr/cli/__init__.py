@@ -6,12 +6,14 @@
 import click
 
 # Local Imports
+from managarr.cli.bench import BenchGroup
 from managarr.cli.generate import GenerateGroup
+from managarr.cli.tmdb import TMDBGroup
 
 
 @click.group(
     name='managarr',
-    commands={'get': GenerateGroup})
+    commands={'bench': BenchGroup, 'get': GenerateGroup, 'tmdb': TMDBGroup})
 def ManagarrCLI():
     """CLI application entrypoint."""
     pass
@@ -0,0 +1,339 @@
+# Standard Library Imports
+import json
+import os
+import tracemalloc
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from statistics import median
+from threading import Thread
+from time import perf_counter, sleep
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlsplit
+
+# Third Party Imports
+import click
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+
+# Local Imports
+import managarr.sources.theposterdb as PosterDB
+from managarr import settings
+from managarr.sources.mediux import get_page_data
+from managarr.settings import LOGR
+from managarr.utils import fetch
+from managarr.utils.compress import compress, get_encodings
+from managarr.utils.scrape import get_soup
+
+# Parser backends compared by the parse benchmark
+parsers = ('lxml', 'html.parser')
+
+# Strainers compared by the parse benchmark, by the type of page they are used for
+parse_strainers: dict[str, SoupStrainer] = {
+    'set': PosterDB.PosterDBPage.parse_only,
+    'poster': PosterDB.poster_parse_only,
+    'user': PosterDB.user_parse_only,
+    'script': SoupStrainer('script')
+}
+
+# Host of the TMDB API, served by a local stand-in during the TMDB benchmark
+TMDB_HOST = 'api.themoviedb.org'
+
+"""
+* Classes
+"""
+
+
+class TMDBStandIn(BaseHTTPRequestHandler):
+    """Answers TMDB movie searches with a single matching result after a fixed delay, standing in for the TMDB
+    API so lookups can be benchmarked without a token or network."""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    latency: float = 0.05
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != '/3/search/movie':
+            self.send_error(404)
+            return
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        title, year = query.get('query', ''), query.get('primary_release_year', '2000')
+        body = json.dumps({'results': [{
+            'id': zlib.crc32(f'{title} ({year})'.encode()),
+            'title': title,
+            'release_date': f'{year}-01-01',
+            'popularity': 1.0
+        }]}).encode()
+        sleep(self.latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class StandInAdapter(HTTPAdapter):
+    """Sends requests made to a host to a local stand-in server instead."""
+
+    def __init__(self, host: str, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.host, self.base_url = host, base_url
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        request.url = request.url.replace(f'https://{self.host}', self.base_url, 1)
+        return super().send(request, **kwargs)
+
+
+"""
+* Utilities
+"""
+
+
+def time_runs(func: Callable[[], Any], runs: int) -> float:
+    """Returns the median time taken by a function over a number of runs, in seconds."""
+    times = []
+    for _ in range(max(1, runs)):
+        s = perf_counter()
+        func()
+        times.append(perf_counter() - s)
+    return median(times)
+
+
+def get_peak_memory(func: Callable[[], Any]) -> int:
+    """Returns the peak memory allocated while running a function once, in bytes."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def is_parser_installed(name: str) -> bool:
+    """Returns True if a BeautifulSoup parser backend is installed."""
+    try:
+        BeautifulSoup('', name)
+    except FeatureNotFound:
+        return False
+    return True
+
+
+def get_page_data_soup(html: str) -> dict:
+    """Returns the set data of a Mediux page the way it was extracted before `get_page_data`, by building the
+    whole page with html.parser, then decoding the set's script with three full-string replacements."""
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup.find_all('script'):
+        if 'files' in script.text and 'set' in script.text and 'Set Link\\' not in script.text:
+            st = (script.text
+                  .replace('\\\\\\\"', "")
+                  .replace("\\", "")
+                  .replace("u0026", "&"))
+            index_start, index_end = st.find('{'), st.rfind('}')
+            return json.loads(st[index_start:index_end + 1])['set']
+    return {}
+
+
+def get_synthetic_set_page(movies: int) -> str:
+    """Returns the HTML of a synthetic ThePosterDB set page listing a number of movie posters."""
+    return '<div class="row d-flex flex-wrap m-0 w-100 mx-n1 mt-n1">' + ''.join(
+        '<div class="col-6 col-lg-2 p-1">'
+        '<a class="text-white" data-toggle="tooltip" data-placement="top" title="Movie"></a>'
+        f'<p class="p-0 mb-1 text-break">Movie {i} ({1970 + i % 50})</p>'
+        f'<div class="overlay" data-poster-id="{i}"></div>'
+        '</div>' for i in range(1, movies + 1)
+    ) + '</div>'
+
+
+def get_synthetic_shows(shows: int, seasons: int, episodes: int) -> list[dict]:
+    """Returns the response data of a synthetic show library, shaped like the /plex/shows endpoint.
+
+    Args:
+        shows: Number of shows.
+        seasons: Number of seasons in each show.
+        episodes: Number of episodes in each season.
+    """
+    url = 'https://plex.example.com/library/metadata/{}/{}/1718000000?X-Plex-Token=xxxxxxxxxxxxxxxxxxxx'
+    key = iter(range(1, shows * (seasons * (episodes + 1) + 1) + 1))
+    return [{
+        "title": f'Show {i}',
+        "poster": url.format(n := next(key), 'thumb'),
+        "background": url.format(n, 'art'),
+        "seasons": [{
+            "season_number": s,
+            "poster": url.format(n := next(key), 'thumb'),
+            "background": url.format(n, 'art'),
+            "episodes": {e: f'/library/metadata/{next(key)}/thumb/1718000000' for e in range(1, episodes + 1)}
+        } for s in range(1, seasons + 1)]
+    } for i in range(1, shows + 1)]
+
+
+"""
+* Commands
+"""
+
+
+@click.command(help='Benchmark rendering and compressing a synthetic show library response.')
+@click.option('--shows', type=int, default=200, help='Number of shows, defaults to 200.')
+@click.option('--seasons', type=int, default=5, help='Number of seasons in each show, defaults to 5.')
+@click.option('--episodes', type=int, default=10, help='Number of episodes in each season, defaults to 10.')
+@click.option('--runs', type=int, default=10, help='Number of times each renderer is timed, defaults to 10.')
+def bench_render(shows: int, seasons: int, episodes: int, runs: int) -> None:
+    """Benchmark the serialization time of each installed renderer, and the wire size of its output with
+    each supported content encoding.
+
+    Args:
+        shows: Number of shows.
+        seasons: Number of seasons in each show.
+        episodes: Number of episodes in each season.
+        runs: Number of times each renderer is timed.
+    """
+    # Renderers are provided by django-ninja, which reads the Django settings when imported
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'managarr.settings')
+    from managarr.utils.render import get_renderer, renderers
+
+    data = get_synthetic_shows(shows, seasons, episodes)
+    LOGR.info(f'Rendering {shows} shows with {shows * seasons * episodes} episodes ...')
+    for name, (_, package) in renderers.items():
+        if not package:
+            LOGR.warning(f"Renderer '{name}' is not installed, skipping!")
+            continue
+        renderer, times = get_renderer(name), []
+        for _ in range(runs):
+            s = perf_counter()
+            body = renderer.render(None, data, response_status=200)
+            times.append(perf_counter() - s)
+        body = body.encode() if isinstance(body, str) else body
+        sizes = [f'{len(body) / 1024:.1f} KiB raw']
+        for encoding in get_encodings():
+            s = perf_counter()
+            size = len(compress(body, encoding))
+            sizes.append(f'{size / 1024:.1f} KiB {encoding} ({(perf_counter() - s) * 1000:.1f} ms)')
+        LOGR.info(f'{name}: {median(times) * 1000:.1f} ms, ' + ', '.join(sizes))
+
+
+@click.command(help='Benchmark parsing saved HTML pages with each parser backend, with and without a strainer.')
+@click.argument('pages', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    '--strainer', type=click.Choice(list(parse_strainers)), default='set',
+    help="Strainer used by the type of page provided, defaults to 'set' (a ThePosterDB set page).")
+@click.option('--runs', type=int, default=5, help='Number of times each page is parsed, defaults to 5.')
+def bench_parse(pages: tuple[Path, ...], strainer: str, runs: int) -> None:
+    """Benchmark the parse time and peak memory of each installed parser backend on saved pages, building the
+    whole page and only the elements matched by a strainer.
+
+    Args:
+        pages: Saved HTML pages, e.g. a large ThePosterDB set page.
+        strainer: Strainer used by the type of page provided.
+        runs: Number of times each page is parsed.
+
+    Note:
+        Peak memory is measured using tracemalloc, which sees the soup built by BeautifulSoup but not memory
+        allocated internally by lxml.
+    """
+    for name in parsers:
+        if not is_parser_installed(name):
+            LOGR.warning(f"Parser '{name}' is not installed, skipping!")
+    for path in pages:
+        html = path.read_text(encoding='utf-8')
+        LOGR.info(f'{path.name} ({len(html) / 1024:.1f} KiB):')
+        for name in [n for n in parsers if is_parser_installed(n)]:
+            for label, parse_only in (('full', None), (strainer, parse_strainers[strainer])):
+                def parse() -> BeautifulSoup:
+                    return BeautifulSoup(html, name, parse_only=parse_only)
+                t, peak = time_runs(parse, runs), get_peak_memory(parse)
+                LOGR.info(f'  {name:<11} {label:<7} {t * 1000:8.1f} ms, {peak / 1048576:6.1f} MiB peak')
+
+
+@click.command(help='Benchmark extracting set data from saved Mediux pages, against the previous soup-based path.')
+@click.argument('pages', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option('--runs', type=int, default=5, help='Number of times each page is extracted, defaults to 5.')
+def bench_mediux(pages: tuple[Path, ...], runs: int) -> None:
+    """Benchmark the time and peak memory of extracting set data from saved Mediux set pages using
+    `get_page_data`, compared with parsing the whole page into a soup and decoding with string replacements.
+
+    Args:
+        pages: Saved HTML of Mediux set pages.
+        runs: Number of times each page is extracted.
+    """
+    for path in pages:
+        html = path.read_text(encoding='utf-8')
+        LOGR.info(f'{path.name} ({len(html) / 1024:.1f} KiB):')
+        results = {}
+        for label, extract in (('soup', get_page_data_soup), ('raw', get_page_data)):
+            t, peak = time_runs(lambda: extract(html), runs), get_peak_memory(lambda: extract(html))
+            results[label] = t, extract(html)
+            LOGR.info(f'  {label:<4} {t * 1000:8.1f} ms, {peak / 1048576:6.1f} MiB peak')
+        if results['soup'][1] != results['raw'][1]:
+            LOGR.warning('  Extracted set data differs between the two paths!')
+        elif not results['raw'][1]:
+            LOGR.warning('  No set data was found on this page!')
+        LOGR.info(f"  {results['soup'][0] / max(results['raw'][0], 1e-9):.1f}x faster")
+
+
+@click.command(help='Benchmark resolving the TMDB IDs of a set page\'s movies against a local TMDB stand-in.')
+@click.option('--movies', type=int, default=40, help='Number of movie posters on the set page, defaults to 40.')
+@click.option('--latency', type=float, default=50, help='Delay of each stand-in response in ms, defaults to 50.')
+@click.option(
+    '--workers', type=int, multiple=True,
+    help='Number of lookup workers to time, can be provided multiple times. Defaults to 1 and TMDB_WORKERS.')
+@click.option('--runs', type=int, default=3, help='Number of times each worker count is timed, defaults to 3.')
+def bench_tmdb(movies: int, latency: float, workers: tuple[int, ...], runs: int) -> None:
+    """Benchmark resolving the TMDB ID of every movie on a synthetic ThePosterDB set page, with each number of
+    lookup workers. TMDB requests are answered by a local stand-in server, and made through the shared HTTP
+    session so the configured TMDB host limit and rate limit still apply.
+
+    Args:
+        movies: Number of movie posters on the set page.
+        latency: Delay of each stand-in response, in milliseconds.
+        workers: Number of lookup workers to time.
+        runs: Number of times each worker count is timed.
+    """
+    # Every lookup must reach the stand-in
+    settings.ENV['TMDB_CACHE'] = {**settings.ENV.get('TMDB_CACHE', {}), 'ENABLED': False}
+    settings.ENV['TMDB_INDEX'] = {**settings.ENV.get('TMDB_INDEX', {}), 'ENABLED': False}
+
+    # Serve the stand-in and route TMDB requests to it
+    TMDBStandIn.latency = latency / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), TMDBStandIn)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, daemon=True).start()
+    fetch.get_session().mount(f'https://{TMDB_HOST}/', StandInAdapter(
+        host=TMDB_HOST,
+        base_url=f'http://127.0.0.1:{server.server_port}',
+        pool_maxsize=fetch.get_config().get('POOL_SIZE', 16)))
+
+    try:
+        soup = get_soup(get_synthetic_set_page(movies), parse_only=PosterDB.PosterDBPage.parse_only)
+        rate = fetch.get_rate_limiter(TMDB_HOST).rate
+        LOGR.info(f'Resolving {movies} movies, {latency:.0f} ms per lookup, limited to {rate:.0f} lookups/s ...')
+        for n in workers or (1, settings.ENV.get('TMDB_WORKERS', 8)):
+            page = PosterDB.PosterDBPage(tmdb_token='', soup=soup, max_workers=n)
+            if (resolved := len([m for m in page.get_movies() if m.id_tmdb])) != movies:
+                LOGR.warning(f'Only {resolved}/{movies} movies were resolved!')
+            t = time_runs(page.get_movies, runs)
+            LOGR.info(f'  {n:>3} workers: {t * 1000:8.1f} ms ({movies / t:.1f} movies/s)')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+"""
+* Command Groups
+"""
+
+
+@click.group(
+    commands={
+        'mediux': bench_mediux,
+        'parse': bench_parse,
+        'render': bench_render,
+        'tmdb': bench_tmdb
+    }
+)
+def BenchGroup():
+    """Command group for benchmarks."""
+    pass
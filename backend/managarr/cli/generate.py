@@ -1,23 +1,115 @@
 # Standard Library Imports
+from pathlib import Path
 from time import perf_counter
+from typing import Iterable, Iterator, Optional
 
 # Third Party Imports
 import click
+import yarl
 from omnitils.files import mkdir_full_perms
 from omnitils.test import time_function
 
 # Local Imports
 from managarr import settings
 from managarr.settings import LOGR
-from managarr.sources import identify_and_scrape
-from managarr.utils._schema import MovieCollection
-from managarr.utils.export import export_movie_collection
+from managarr.sources import (
+    SourcePage, identify_and_scrape, fetch_source, parse_source, is_user_page, iter_theposterdb_user_sets)
+from managarr.sources.themoviedb import get_cache
+from managarr.utils.fetch import get_rates, get_stats
+from managarr.utils.pipeline import Pipeline, PipelineStage
+from managarr.utils.scrape import get_page_cache
+from managarr.utils._schema import MovieCollection, TVShow
+from managarr.utils.export import export_movie_collection, export_tv_show
 
 # Paths
 export_dir = settings.BASE_DIR / 'export'
 mkdir_full_perms(export_dir)
 
 
+"""
+* Utilities
+"""
+
+
+def log_usage_stats() -> None:
+    """Log TMDB lookup cache, page cache, and HTTP usage."""
+    if cache := get_cache():
+        LOGR.info('TMDB cache: {hits} hits, {misses} misses'.format(**cache.stats))
+    if cache := get_page_cache():
+        LOGR.info('Page cache: {hits} not modified, {misses} downloaded'.format(**cache.stats))
+    rates = get_rates()
+    for host, stats in get_stats().items():
+        LOGR.info('{host}: {requests} requests, {bytes} bytes, {connections} connections, {rate:.1f} req/s'.format(
+            host=host, rate=rates.get(host, 0), **stats))
+
+
+"""
+* Batch Stages
+"""
+
+
+def expand_urls(urls: Iterable[str]) -> Iterator[yarl.URL]:
+    """Yield each URL, replacing ThePosterDB user pages with the sets they list."""
+    for url in urls:
+        url = yarl.URL(url)
+        if is_user_page(url):
+            yield from iter_theposterdb_user_sets(url)
+            continue
+        yield url
+
+
+def parse_stage(page: tuple[yarl.URL, str]) -> Optional[tuple[yarl.URL, SourcePage]]:
+    """Parse a fetched page."""
+    url, html = page
+    if parsed := parse_source(url, html):
+        return url, parsed
+
+
+def resolve_stage(page: tuple[yarl.URL, SourcePage]) -> Optional[tuple[yarl.URL, MovieCollection | TVShow]]:
+    """Build a collection from a parsed page, resolving TMDB IDs where needed."""
+    url, parsed = page
+    if collection := parsed.get_collection():
+        return url, collection
+
+
+def export_stage(item: tuple[yarl.URL, MovieCollection | TVShow]) -> MovieCollection | TVShow:
+    """Export a collection to Kometa metadata and collection yaml files."""
+    url, collection = item
+    if isinstance(collection, MovieCollection):
+        export_movie_collection(url=str(url), path=export_dir, collection=collection)
+    elif isinstance(collection, TVShow):
+        export_tv_show(url=str(url), path=export_dir, show=collection)
+    return collection
+
+
+def run_batch(
+    urls: Iterable[str],
+    n_fetch: Optional[int] = None,
+    n_parse: Optional[int] = None,
+    n_resolve: Optional[int] = None
+) -> None:
+    """Scrape and export each URL through the batch pipeline, then log a throughput summary.
+
+    Args:
+        urls: URLs of sets, posters, or ThePosterDB user pages.
+        n_fetch: Max number of pages fetched at once.
+        n_parse: Max number of pages parsed at once.
+        n_resolve: Max number of sets resolved against TMDB at once.
+    """
+    config = settings.ENV.get('BATCH', {})
+
+    # Exports append to shared files, so they're always written one at a time
+    pipeline = Pipeline([
+        PipelineStage('fetch', fetch_source, n_fetch or config.get('FETCH', 8)),
+        PipelineStage('parse', parse_stage, n_parse or config.get('PARSE', 2)),
+        PipelineStage('resolve', resolve_stage, n_resolve or config.get('RESOLVE', 4)),
+        PipelineStage('export', export_stage, 1)])
+    for collection in pipeline.run(expand_urls(urls)):
+        LOGR.info(f'Processed: {collection.title}')
+    LOGR.info(pipeline.get_summary())
+    log_usage_stats()
+
+
 """
 * Commands
 """
@@ -33,6 +125,10 @@ def generate_movie_collection(url: str) -> None:
         url: URL of the collection.
     """
 
+    # User pages list multiple sets
+    if is_user_page(yarl.URL(url)):
+        return LOGR.warning("The URL provided is a ThePosterDB user page, use 'managarr get user' instead!")
+
     # Scrape from the appropriate source
     _collection = identify_and_scrape(url)
 
@@ -45,6 +141,58 @@ def generate_movie_collection(url: str) -> None:
         url=url,
         path=export_dir,
         collection=_collection)
+    log_usage_stats()
+
+
+@click.command(help='Add every TPDB or Mediux set listed in a file to Kometa metadata and collection yaml files.')
+@click.argument('file', type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option('--fetch', 'n_fetch', type=int, help='Max number of pages fetched at once.')
+@click.option('--parse', 'n_parse', type=int, help='Max number of pages parsed at once.')
+@click.option('--resolve', 'n_resolve', type=int, help='Max number of sets resolved against TMDB at once.')
+def generate_batch(
+    file: Path,
+    n_fetch: Optional[int] = None,
+    n_parse: Optional[int] = None,
+    n_resolve: Optional[int] = None
+) -> None:
+    """Add every TPDB or Mediux set listed in a file to Kometa metadata and collection yaml files.
+
+    Args:
+        file: Text file containing one URL per line, blank lines and lines starting with '#' are ignored.
+            ThePosterDB user pages are expanded into every set the user has uploaded.
+        n_fetch: Max number of pages fetched at once.
+        n_parse: Max number of pages parsed at once.
+        n_resolve: Max number of sets resolved against TMDB at once.
+    """
+    with open(file, encoding='utf-8') as f:
+        urls = list(dict.fromkeys(
+            line.strip() for line in f
+            if line.strip() and not line.startswith('#')))
+    run_batch(urls, n_fetch=n_fetch, n_parse=n_parse, n_resolve=n_resolve)
+
+
+@click.command(help='Add every set uploaded by a TPDB user to Kometa metadata and collection yaml files.')
+@click.argument('url')
+@click.option('--fetch', 'n_fetch', type=int, help='Max number of pages fetched at once.')
+@click.option('--parse', 'n_parse', type=int, help='Max number of pages parsed at once.')
+@click.option('--resolve', 'n_resolve', type=int, help='Max number of sets resolved against TMDB at once.')
+def generate_user(
+    url: str,
+    n_fetch: Optional[int] = None,
+    n_parse: Optional[int] = None,
+    n_resolve: Optional[int] = None
+) -> None:
+    """Add every set uploaded by a TPDB user to Kometa metadata and collection yaml files.
+
+    Args:
+        url: URL of the user page.
+        n_fetch: Max number of pages fetched at once.
+        n_parse: Max number of pages parsed at once.
+        n_resolve: Max number of sets resolved against TMDB at once.
+    """
+    if not is_user_page(yarl.URL(url)):
+        return LOGR.warning('The URL provided is not a ThePosterDB user page!')
+    run_batch([url], n_fetch=n_fetch, n_parse=n_parse, n_resolve=n_resolve)
 
 
 """
@@ -54,7 +202,9 @@ def generate_movie_collection(url: str) -> None:
 
 @click.group(
     commands={
-        'movies': generate_movie_collection
+        'movies': generate_movie_collection,
+        'batch': generate_batch,
+        'user': generate_user
     }
 )
 def GenerateGroup():
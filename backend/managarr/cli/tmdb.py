@@ -0,0 +1,76 @@
+# Standard Library Imports
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+# Third Party Imports
+import click
+from omnitils.test import time_function
+
+# Local Imports
+from managarr.settings import LOGR
+from managarr.sources.themoviedb import build_index, export_types
+
+"""
+* Commands
+"""
+
+
+@click.command(help='Build the offline TMDB ID index from TMDB daily ID export files.')
+@click.option(
+    '--type', 'media_types', multiple=True,
+    type=click.Choice(list(export_types)), default=list(export_types),
+    help='Media type to index, can be provided multiple times. Indexes every type by default.')
+@click.option(
+    '--date', 'export_date', type=click.DateTime(formats=['%Y-%m-%d']),
+    help='Date of the export files to download, defaults to yesterday (UTC).')
+@click.option(
+    '--file', 'path', type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help='Previously downloaded export file to index instead, requires a single --type.')
+@time_function('That took {t:2f} seconds!')
+def build_tmdb_index(
+    media_types: tuple[str, ...],
+    export_date: Optional[datetime] = None,
+    path: Optional[Path] = None
+) -> None:
+    """Build the offline TMDB ID index from TMDB daily ID export files.
+
+    Args:
+        media_types: Media types to index.
+        export_date: Date of the export files to download.
+        path: Previously downloaded export file to index instead.
+    """
+    if path and len(media_types) != 1:
+        return LOGR.warning('Please provide a single --type when indexing a local export file!')
+    for media_type in media_types:
+        LOGR.info(f'Indexing TMDB {media_type} IDs ...')
+        count = build_index(
+            media_type=media_type,
+            export_date=export_date.date() if export_date else None,
+            path=path)
+        LOGR.info(f'Indexed {count} unique {media_type} titles.')
+
+
+"""
+* Command Groups
+"""
+
+
+@click.group(
+    commands={
+        'build': build_tmdb_index
+    }
+)
+def IndexGroup():
+    """Command group for managing the offline TMDB ID index."""
+    pass
+
+
+@click.group(
+    commands={
+        'index': IndexGroup
+    }
+)
+def TMDBGroup():
+    """Command group for TMDB utilities."""
+    pass
@@ -0,0 +1,154 @@
+# Generated by Django 5.0.6 on 2026-10-17 17:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Collection',
+            fields=[
+                ('rating_key', models.PositiveBigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=512)),
+                ('title_sort', models.CharField(max_length=512)),
+                ('index', models.IntegerField(null=True)),
+                ('thumb', models.CharField(max_length=255, null=True)),
+                ('art', models.CharField(max_length=255, null=True)),
+                ('added_at', models.DateTimeField(null=True)),
+                ('updated_at', models.DateTimeField(null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Section',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('type', models.CharField(max_length=32)),
+                ('updated_at', models.DateTimeField(null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CollectionItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('rating_key', models.PositiveBigIntegerField(db_index=True)),
+                ('collection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='managarr.collection')),
+            ],
+            options={
+                'ordering': ['collection', 'position'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Season',
+            fields=[
+                ('rating_key', models.PositiveBigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=512)),
+                ('title_sort', models.CharField(max_length=512)),
+                ('index', models.IntegerField(null=True)),
+                ('thumb', models.CharField(max_length=255, null=True)),
+                ('art', models.CharField(max_length=255, null=True)),
+                ('added_at', models.DateTimeField(null=True)),
+                ('updated_at', models.DateTimeField(null=True)),
+                ('section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='managarr.section')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Movie',
+            fields=[
+                ('rating_key', models.PositiveBigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=512)),
+                ('title_sort', models.CharField(max_length=512)),
+                ('index', models.IntegerField(null=True)),
+                ('thumb', models.CharField(max_length=255, null=True)),
+                ('art', models.CharField(max_length=255, null=True)),
+                ('added_at', models.DateTimeField(null=True)),
+                ('updated_at', models.DateTimeField(null=True)),
+                ('section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='managarr.section')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Episode',
+            fields=[
+                ('rating_key', models.PositiveBigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=512)),
+                ('title_sort', models.CharField(max_length=512)),
+                ('index', models.IntegerField(null=True)),
+                ('thumb', models.CharField(max_length=255, null=True)),
+                ('art', models.CharField(max_length=255, null=True)),
+                ('added_at', models.DateTimeField(null=True)),
+                ('updated_at', models.DateTimeField(null=True)),
+                ('season', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='episodes', to='managarr.season')),
+                ('section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='managarr.section')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='collection',
+            name='section',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='managarr.section'),
+        ),
+        migrations.CreateModel(
+            name='Show',
+            fields=[
+                ('rating_key', models.PositiveBigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=512)),
+                ('title_sort', models.CharField(max_length=512)),
+                ('index', models.IntegerField(null=True)),
+                ('thumb', models.CharField(max_length=255, null=True)),
+                ('art', models.CharField(max_length=255, null=True)),
+                ('added_at', models.DateTimeField(null=True)),
+                ('updated_at', models.DateTimeField(null=True)),
+                ('section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='managarr.section')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='season',
+            name='show',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='seasons', to='managarr.show'),
+        ),
+        migrations.CreateModel(
+            name='SyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('libtype', models.CharField(max_length=32)),
+                ('high_water', models.PositiveBigIntegerField()),
+                ('synced', models.DateTimeField()),
+                ('section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_states', to='managarr.section')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='collectionitem',
+            constraint=models.UniqueConstraint(fields=('collection', 'position'), name='collection_item_position'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['section', 'title_sort'], name='movie_section_title'),
+        ),
+        migrations.AddIndex(
+            model_name='episode',
+            index=models.Index(fields=['section', 'title_sort'], name='episode_section_title'),
+        ),
+        migrations.AddIndex(
+            model_name='collection',
+            index=models.Index(fields=['section', 'title_sort'], name='collection_section_title'),
+        ),
+        migrations.AddIndex(
+            model_name='show',
+            index=models.Index(fields=['section', 'title_sort'], name='show_section_title'),
+        ),
+        migrations.AddIndex(
+            model_name='season',
+            index=models.Index(fields=['section', 'title_sort'], name='season_section_title'),
+        ),
+        migrations.AddConstraint(
+            model_name='syncstate',
+            constraint=models.UniqueConstraint(fields=('section', 'libtype'), name='sync_state_section_libtype'),
+        ),
+    ]
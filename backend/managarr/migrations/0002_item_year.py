@@ -0,0 +1,44 @@
+# Generated by Django 5.0.6 on 2026-10-17 17:19
+
+from django.db import migrations, models
+
+
+def reset_sync_state(apps, schema_editor):
+    """Drop every high-water mark, so the next sync fetches the year of items mirrored before it was stored."""
+    apps.get_model('managarr', 'SyncState').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('managarr', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='collection',
+            name='year',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='episode',
+            name='year',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='year',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='season',
+            name='year',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='show',
+            name='year',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.RunPython(reset_sync_state, migrations.RunPython.noop),
+    ]
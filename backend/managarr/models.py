@@ -0,0 +1,103 @@
+"""
+* Plex Library Mirror Models
+"""
+# Third Party Imports
+from django.db import models
+
+"""
+* Sections
+"""
+
+
+class Section(models.Model):
+    """A Plex library section mirrored by the library sync."""
+    id = models.PositiveIntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    type = models.CharField(max_length=32)
+    updated_at = models.DateTimeField(null=True)
+
+    def __str__(self) -> str:
+        return self.title
+
+
+class SyncState(models.Model):
+    """The latest Plex updatedAt synced for an item type in a section."""
+    section = models.ForeignKey(Section, on_delete=models.CASCADE, related_name='sync_states')
+    libtype = models.CharField(max_length=32)
+    high_water = models.PositiveBigIntegerField()
+    synced = models.DateTimeField()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['section', 'libtype'], name='sync_state_section_libtype')]
+
+
+"""
+* Items
+"""
+
+
+class Item(models.Model):
+    """A Plex item mirrored by the library sync, keyed by its ratingKey.
+
+    Note:
+        `title_sort` is stored in lowercase, so items can be listed in case-insensitive title order using an index.
+    """
+    rating_key = models.PositiveBigIntegerField(primary_key=True)
+    section = models.ForeignKey(Section, on_delete=models.CASCADE, related_name='+')
+    title = models.CharField(max_length=512)
+    title_sort = models.CharField(max_length=512)
+    index = models.IntegerField(null=True)
+    year = models.PositiveSmallIntegerField(null=True)
+    thumb = models.CharField(max_length=255, null=True)
+    art = models.CharField(max_length=255, null=True)
+    added_at = models.DateTimeField(null=True)
+    updated_at = models.DateTimeField(null=True)
+
+    class Meta:
+        abstract = True
+
+    def __str__(self) -> str:
+        return self.title
+
+
+class Movie(Item):
+    class Meta:
+        indexes = [models.Index(fields=['section', 'title_sort'], name='movie_section_title')]
+
+
+class Show(Item):
+    class Meta:
+        indexes = [models.Index(fields=['section', 'title_sort'], name='show_section_title')]
+
+
+class Season(Item):
+    # Item types are synced independently, so a season may be stored before its show
+    show = models.ForeignKey(Show, on_delete=models.CASCADE, db_constraint=False, related_name='seasons')
+
+    class Meta:
+        indexes = [models.Index(fields=['section', 'title_sort'], name='season_section_title')]
+
+
+class Episode(Item):
+    # Item types are synced independently, so an episode may be stored before its season
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, db_constraint=False, related_name='episodes')
+
+    class Meta:
+        indexes = [models.Index(fields=['section', 'title_sort'], name='episode_section_title')]
+
+
+class Collection(Item):
+    class Meta:
+        indexes = [models.Index(fields=['section', 'title_sort'], name='collection_section_title')]
+
+
+class CollectionItem(models.Model):
+    """An item in a collection, referenced by ratingKey since a collection can hold movies or shows."""
+    collection = models.ForeignKey(Collection, on_delete=models.CASCADE, related_name='members')
+    position = models.PositiveIntegerField()
+    rating_key = models.PositiveBigIntegerField(db_index=True)
+
+    class Meta:
+        ordering = ['collection', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['collection', 'position'], name='collection_item_position')]
@@ -2,123 +2,724 @@
 * Plex API Endpoints
 """
 # Standard Library
-import yarl
+import asyncio
+import hashlib
+import re
+from collections import defaultdict
+from threading import Lock
+from typing import Callable, Literal, Optional
+from xml.etree.ElementTree import Element
 
 # Third Party Imports
-from ninja import Router
+import requests
+import yarl
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import parse_etags, quote_etag
+from ninja import Query, Router
+from omnitils.logs import logger
+from plexapi import utils
+from plexapi.library import LibrarySection
 from plexapi.server import PlexServer
+from plexapi.video import Movie
 
 # Local Imports
-from managarr.sources.plex.schemas import MovieSchema, ShowSchema, ShowCollectionSchema, MovieCollectionSchema
+from managarr import settings
+from managarr.sources.plex.core import PlexClient, iter_section_items, map_concurrent
+from managarr.sources.plex.schemas import (
+    MovieSchema, ShowSchema, ShowCollectionSchema, MovieCollectionSchema, ServerMoviesSchema, ServerShowsSchema,
+    SearchSchema)
+from managarr.sources.plex.search import get_index
+from managarr.sources.plex.snapshot import Snapshot, SnapshotCache
+from managarr.sources.plex.sync import (
+    get_fingerprint, get_mirror, get_section_query, iter_elements, sync_section)
 from managarr.apps import ManagarrConfig
+from managarr.utils.cache import ImageCache
 
 # API objects
-PlexAPI: PlexServer = ManagarrConfig.PlexAPI
+PlexAPI: PlexClient = ManagarrConfig.PlexAPI
+PlexServers: dict[str, PlexClient] = ManagarrConfig.PlexServers
+PlexCache: SnapshotCache = ManagarrConfig.PlexCache
 api = Router()
 
+# Image cache, created on first use
+_image_cache: Optional[ImageCache] = None
+_image_cache_lock = Lock()
+
+# Depth of show data returned by the show endpoints
+Depth = Literal['show', 'season', 'episode']
+
+# Item types synced to build show data at each depth
+depth_libtypes: dict[str, tuple[str, ...]] = {
+    'show': ('show',),
+    'season': ('show', 'season'),
+    'episode': ('show', 'season', 'episode')
+}
+
+# Matches the ratingKey, image type, and timestamp in a Plex image path
+image_path_pattern = re.compile(r'^/library/(?:metadata|collections)/(\d+)/(thumb|art|composite)/(\d+)$')
+
+"""
+* Images
+"""
+
+
+def get_image_cache() -> Optional[ImageCache]:
+    """Returns the transcoded image cache, or None if caching is disabled."""
+    global _image_cache
+    config = settings.ENV.get('IMAGE_CACHE', {})
+    if not config.get('ENABLED', True):
+        return None
+    with _image_cache_lock:
+        if _image_cache is None:
+            _image_cache = ImageCache(
+                path=settings.BASE_DIR / 'cache' / 'images.sqlite3',
+                max_size=config.get('MAX_SIZE', 1073741824))
+        return _image_cache
+
+
+def get_transcode_url(url: str, width: int = 360, height: int = 540) -> str:
+    """Returns the URL of an image transcoded to a given size by the Plex server.
+
+    Args:
+        url: Plex image path or URL of the image.
+        width: Width to transcode to.
+        height: Height to transcode to.
+    """
+    return PlexAPI.transcodeImage(url, height=height, width=width, minSize=1, upscale=1)
+
+
+def get_image_path(rating_key: int, kind: str, timestamp: int) -> str:
+    """Returns the Plex path of an item's image."""
+    if kind == 'composite':
+        return f'/library/collections/{rating_key}/composite/{timestamp}'
+    return f'/library/metadata/{rating_key}/{kind}/{timestamp}'
+
+
+def get_proxy_url(path: Optional[str], width: int = 360, height: int = 540) -> Optional[str]:
+    """Returns the URL of an image transcoded to a given size and served through the image proxy.
+
+    Args:
+        path: Plex image path, images not hosted by Plex are transcoded by Plex directly instead.
+        width: Width to transcode to.
+        height: Height to transcode to.
+
+    Returns:
+        URL of the transcoded image, or None if no image path was provided.
+    """
+    if not path:
+        return None
+    if not (match := image_path_pattern.match(path)):
+        return get_transcode_url(path, width=width, height=height)
+    rating_key, kind, timestamp = match.groups()
+    url = reverse('api:plex_image', kwargs={'rating_key': rating_key, 'kind': kind, 'timestamp': timestamp})
+    return str(yarl.URL(url).with_query({'width': width, 'height': height}))
+
+
+"""
+* Library Data
+"""
+
+
+def to_item(element: Element) -> dict:
+    """Returns the XML element of a Plex item as a dictionary of the attributes stored for mirrored items.
+
+    Note:
+        Elements are read directly rather than through plexapi objects, since reading a missing attribute of a
+        partial object reloads it from Plex, one request per item.
+    """
+    return {
+        "ratingKey": int(element.attrib['ratingKey']),
+        "parentRatingKey": utils.cast(int, element.attrib.get('parentRatingKey')),
+        "title": element.attrib.get('title') or '',
+        "index": utils.cast(int, element.attrib.get('index')),
+        "thumb": element.attrib.get('thumb'),
+        "art": element.attrib.get('art')
+    }
+
+
+def get_movie_data(movie: Movie) -> dict:
+    """Returns the data of a movie, read from the XML element Plex returned for it, see `to_item`."""
+    item = to_item(movie._data)
+    return {
+        "title": item['title'],
+        "poster": get_image_url(item['thumb'], movie._server),
+        "background": get_image_url(item['art'], movie._server)
+    }
+
+
+def get_image_url(path: Optional[str], server: Optional[PlexServer | PlexClient] = None) -> Optional[str]:
+    """Returns the full URL of a Plex image path, or None if no path is provided.
+
+    Args:
+        path: Plex image path.
+        server: Plex server hosting the image, defaults to the default server.
+    """
+    return (PlexAPI if server is None else server).url(path, includeToken=True) if path else None
+
+
+def get_show_data(
+    show: dict,
+    seasons: dict[int, list[dict]],
+    episodes: dict[int, list[dict]],
+    depth: Depth = 'episode',
+    image_url: Callable[[Optional[str]], Optional[str]] = get_image_url
+) -> dict:
+    """Returns the data of a show, using seasons and episodes stored in the library mirror.
 
-def get_transcode_url(url: str, token: str):
-    url = yarl.URL('https://plex.texflix.org/photo/:/transcode').with_query({
-        'width': 360,
-        'height': 540,
-        'minSize': 1,
-        'upscale': 1,
-        'url': f'{url}?X-Plex-Token={token}',
-        'X-Plex-Token': token
-    })
-
-
-@api.get("/movies/{library_name}", response=list[MovieSchema])
-def get_movies_in_library(request, library_name: str):
-    library = PlexAPI.library.section(library_name)
-    movies = []
-    for movie in library.all():
-        movies.append({
-            "title": movie.title,
-            "poster": movie.thumbUrl,
-            "background": movie.artUrl
+    Args:
+        show: Mirrored show.
+        seasons: Mirrored seasons in the section, grouped by the ratingKey of their show.
+        episodes: Mirrored episodes in the section, grouped by the ratingKey of their season.
+        depth: Deepest level of data to include, seasons are omitted at 'show' and episodes are omitted at 'season'.
+        image_url: Returns the full URL of an image path, defaults to images hosted by the default server.
+    """
+    data = {
+        "title": show['title'],
+        "poster": image_url(show['thumb']),
+        "background": image_url(show['art'])
+    }
+    if depth == 'show':
+        return data
+    data['seasons'] = []
+    for season in seasons.get(show['ratingKey'], []):
+        data['seasons'].append({
+            "season_number": season['index'],
+            "poster": image_url(season['thumb']),
+            "background": image_url(season['art'])
         })
-    return movies
-
-
-@api.get("/shows/{library_name}", response=list[ShowSchema])
-def get_shows_in_library(request, library_name: str):
-    library = PlexAPI.library.section(library_name)
-    shows = []
-    for show in library.all():
-        seasons = []
-        for season in show.seasons():
-            episodes = {episode.index: episode.thumb for episode in season.episodes()}
-            seasons.append({
-                "season_number": season.index,
-                "poster": season.thumbUrl,
-                "background": season.artUrl,
-                "episodes": episodes
+        if depth == 'episode':
+            data['seasons'][-1]['episodes'] = {
+                episode['index']: episode['thumb'] for episode in episodes.get(season['ratingKey'], [])}
+    return data
+
+
+def get_show_keys(show: dict, seasons: dict[int, list[dict]], episodes: dict[int, list[dict]]) -> set[int]:
+    """Returns the ratingKeys of a show and each of its seasons and episodes."""
+    keys = {show['ratingKey']}
+    for season in seasons.get(show['ratingKey'], []):
+        keys.add(season['ratingKey'])
+        keys.update(episode['ratingKey'] for episode in episodes.get(season['ratingKey'], []))
+    return keys
+
+
+def get_page(items: list, offset: int = 0, limit: Optional[int] = None) -> list:
+    """Returns a page of items."""
+    return items[offset:None if limit is None else offset + limit]
+
+
+"""
+* Sparse Fieldsets
+"""
+
+
+def get_fields(fields: Optional[str]) -> Optional[set[str]]:
+    """Returns the set of fields requested by a comma separated `fields` parameter, or None if every field
+    is requested."""
+    if fields is None:
+        return None
+    return {n.strip() for n in fields.split(',') if n.strip()}
+
+
+def get_depth(depth: Depth, fields: Optional[set[str]]) -> Depth:
+    """Returns the depth of show data to build, lowered when the seasons or episodes aren't requested."""
+    if fields is not None and 'seasons' not in fields:
+        return 'show'
+    if fields is not None and 'episodes' not in fields and depth == 'episode':
+        return 'season'
+    return depth
+
+
+def trim_fields(items: list[dict], fields: Optional[set[str]]) -> list[dict]:
+    """Returns items with only the requested fields, applied to the items at every level of nesting.
+
+    Args:
+        items: Response data.
+        fields: Fields to keep, keeps every field if not provided.
+    """
+    if fields is None:
+        return items
+    return [{
+        k: trim_fields(v, fields) if isinstance(v, list) else v
+        for k, v in item.items() if k in fields
+    } for item in items]
+
+
+"""
+* Snapshots
+"""
+
+
+def build_movies(library: LibrarySection) -> Snapshot:
+    """Returns a snapshot of every movie in a library section."""
+    sync_section(library, libtypes=('movie',))
+    return Snapshot(
+        section_id=int(library.key),
+        items=[{
+            "title": movie['title'],
+            "poster": get_image_url(movie['thumb']),
+            "background": get_image_url(movie['art'])
+        } for movie in get_mirror().get_items(int(library.key), 'movie')])
+
+
+def get_show_children(section_id: int, depth: Depth) -> tuple[dict[int, list[dict]], dict[int, list[dict]]]:
+    """Returns the mirrored seasons and episodes in a section needed to build show data at a given depth."""
+    mirror = get_mirror()
+    seasons = mirror.get_children(section_id, 'season') if depth != 'show' else {}
+    episodes = mirror.get_children(section_id, 'episode') if depth == 'episode' else {}
+    return seasons, episodes
+
+
+def build_shows(library: LibrarySection, depth: Depth = 'episode') -> Snapshot:
+    """Returns a snapshot of every show in a library section, syncing only the item types needed at a given
+    depth."""
+    sync_section(library, libtypes=depth_libtypes[depth])
+    mirror, section_id = get_mirror(), int(library.key)
+    seasons, episodes = get_show_children(section_id, depth)
+    return Snapshot(
+        section_id=section_id,
+        items=[get_show_data(show, seasons, episodes, depth) for show in mirror.get_items(section_id, 'show')])
+
+
+def build_movie_collections(library: LibrarySection, movies: bool = True) -> Snapshot:
+    """Returns a snapshot of every movie collection in a library section.
+
+    Args:
+        library: Plex library section.
+        movies: Whether to include the movies in each collection, movies aren't synced if not included.
+    """
+    sync_section(library, libtypes=('collection', 'movie') if movies else ('collection',))
+    mirror, section_id = get_mirror(), int(library.key)
+    members = mirror.get_collection_items(section_id) if movies else {}
+    collections, keys = [], set()
+    for collection in mirror.get_items(section_id, 'collection'):
+        keys.add(collection['ratingKey'])
+        data = {
+            "title": collection['title'],
+            "poster": get_proxy_url(collection['thumb']),
+            "background": get_image_url(collection['art'])
+        }
+        if not collection['thumb']:
+            print(collection['title'], 'missing thumbnail!')
+        if not collection['art']:
+            print(collection['title'], 'missing background!')
+        collections.append(data)
+        if not movies:
+            continue
+        data['movies'] = []
+        for movie in members.get(collection['ratingKey'], []):
+            keys.add(movie['ratingKey'])
+            if not movie['thumb']:
+                print(movie['title'], 'missing thumbnail!')
+            if not movie['art']:
+                print(movie['title'], 'missing background!')
+            data['movies'].append({
+                "title": movie['title'],
+                "poster": get_proxy_url(movie['thumb']),
+                "background": get_image_url(movie['art'])
             })
-        shows.append({
-            "title": show.title,
-            "poster": show.thumbUrl,
-            "background": show.artUrl,
-            "seasons": seasons
-        })
+    return Snapshot(section_id=section_id, items=collections, keys=keys)
+
+
+def build_show_collections(library: LibrarySection, depth: Optional[Depth] = 'episode') -> Snapshot:
+    """Returns a snapshot of every show collection in a library section.
+
+    Args:
+        library: Plex library section.
+        depth: Depth of the show data included for the shows in each collection, shows aren't included or synced
+            if not provided.
+    """
+    sync_section(library, libtypes=('collection', *(depth_libtypes[depth] if depth else ())))
+    mirror, section_id = get_mirror(), int(library.key)
+    seasons, episodes = get_show_children(section_id, depth) if depth else ({}, {})
+    members = mirror.get_collection_items(section_id) if depth else {}
+    collections, keys = [], set()
+    for collection in mirror.get_items(section_id, 'collection'):
+        keys.add(collection['ratingKey'])
+        data = {
+            "title": collection['title'],
+            "poster": get_image_url(collection['thumb']),
+            "background": get_image_url(collection['art'])
+        }
+        collections.append(data)
+        if not depth:
+            continue
+        data['shows'] = []
+        for show in members.get(collection['ratingKey'], []):
+            keys.update(get_show_keys(show, seasons, episodes))
+            data['shows'].append(get_show_data(show, seasons, episodes, depth))
+    return Snapshot(section_id=section_id, items=collections, keys=keys)
+
+
+def get_snapshot(
+    library_name: str,
+    kind: str,
+    build: Callable[[LibrarySection], Snapshot],
+    fingerprint: Optional[str] = None
+) -> Snapshot:
+    """Returns a cached snapshot of a library section, building it from Plex if it is missing or stale.
+
+    Args:
+        library_name: Name of the library section.
+        kind: Type of data held by the snapshot, e.g. 'movies'.
+        build: Builds a new snapshot from the library section.
+        fingerprint: Current fingerprint of the library section, snapshots built from a different fingerprint
+            are stale.
+    """
+    cached = PlexCache.get(library_name, kind)
+    if cached is not None and None not in (cached.fingerprint, fingerprint) and cached.fingerprint != fingerprint:
+        PlexCache.invalidate(section_id=cached.section_id)
+    snapshot = PlexCache.get_or_build(library_name, kind, lambda: build(PlexAPI.library.section(library_name)))
+    if snapshot.fingerprint is None:
+        snapshot.fingerprint = fingerprint
+    return snapshot
+
+
+async def get_snapshot_async(
+    library_name: str,
+    kind: str,
+    build: Callable[[LibrarySection], Snapshot],
+    fingerprint: Optional[str] = None
+) -> Snapshot:
+    """Returns a cached snapshot of a library section without blocking the event loop, see `get_snapshot`."""
+    return await sync_to_async(get_snapshot, thread_sensitive=False)(library_name, kind, build, fingerprint)
+
+
+def get_movies(
+    library_name: str,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    fields: Optional[set[str]] = None,
+    fingerprint: Optional[str] = None
+) -> list[dict]:
+    """Returns a page of movies in a library section, fetching a single page live rather than building a
+    snapshot of the whole section if no snapshot is cached."""
+    if limit is not None and PlexCache.get(library_name, 'movies') is None:
+        library = PlexAPI.library.section(library_name)
+        movies = [get_movie_data(movie) for movie in iter_section_items(library, offset=offset, limit=limit)]
+    else:
+        movies = get_page(get_snapshot(library_name, 'movies', build_movies, fingerprint).items, offset, limit)
+    return trim_fields(movies, fields)
+
+
+"""
+* Conditional Requests
+"""
+
+
+async def get_etag(request, library_name: str, libtypes: tuple[str, ...]) -> tuple[str, str]:
+    """Returns the fingerprint of the item types in a library section used to build a response, along with the
+    ETag of the response, which also depends on the request's query parameters."""
+    fingerprint = await sync_to_async(
+        lambda: get_fingerprint(PlexAPI.library.section(library_name), libtypes), thread_sensitive=False)()
+    etag = hashlib.sha1(f'{fingerprint}|{request.get_full_path()}'.encode()).hexdigest()
+    return fingerprint, quote_etag(etag)
+
+
+def is_not_modified(request, etag: str) -> bool:
+    """Returns True if the client's cached response, sent using If-None-Match, matches an ETag."""
+    if not (header := request.headers.get('If-None-Match')):
+        return False
+    etags = {n.removeprefix('W/') for n in parse_etags(header)}
+    return '*' in etags or etag in etags
+
+
+def set_etag(response: HttpResponse, etag: str) -> HttpResponse:
+    """Sets the ETag of a response, and requires clients to revalidate it before reusing it."""
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+"""
+* Servers
+"""
+
+
+def get_server_sections(client: PlexClient, libtype: str, library: Optional[str] = None) -> list[LibrarySection]:
+    """Returns the library sections of a type on a Plex server, optionally only those with a given name."""
+    return [
+        n for n in client.library.sections()
+        if n.type == libtype and (library is None or n.title == library)]
+
+
+def get_server_movies(client: PlexClient, library: Optional[str] = None) -> list[dict]:
+    """Returns every movie in the movie libraries of a Plex server, tagged by server and library."""
+    return [
+        {**get_movie_data(movie), "server": client.name, "library": section.title}
+        for section in get_server_sections(client, 'movie', library)
+        for movie in iter_section_items(section)]
+
+
+def get_server_items(section: LibrarySection, libtype: str) -> list[dict]:
+    """Returns every item of a type in a section on a Plex server, read from the XML elements Plex returns."""
+    return [to_item(n) for n in iter_elements(section._server, get_section_query(section, libtype))]
+
+
+def get_server_children(items: list[dict]) -> dict[int, list[dict]]:
+    """Returns items grouped by parent ratingKey and sorted by index, like `LibraryMirror.get_children`."""
+    children: dict[int, list[dict]] = defaultdict(list)
+    for item in items:
+        children[item['parentRatingKey']].append(item)
+    for items in children.values():
+        items.sort(key=lambda n: n['index'] if n['index'] is not None else -1)
+    return children
+
+
+def get_server_shows(client: PlexClient, library: Optional[str] = None, depth: Depth = 'episode') -> list[dict]:
+    """Returns every show in the TV libraries of a Plex server, tagged by server and library. Each item type
+    needed at a given depth is fetched at once."""
+    def image_url(path: Optional[str]) -> Optional[str]:
+        return get_image_url(path, client)
+
+    shows, libtypes = [], depth_libtypes[depth]
+    for section in get_server_sections(client, 'show', library):
+        items = dict(zip(libtypes, map_concurrent(lambda n: get_server_items(section, n), libtypes)))
+        seasons = get_server_children(items.get('season', []))
+        episodes = get_server_children(items.get('episode', []))
+        shows.extend({
+            **get_show_data(show, seasons, episodes, depth, image_url),
+            "server": client.name,
+            "library": section.title
+        } for show in items['show'])
     return shows
 
 
-@api.get("/collections/movie/{library_name}", response=list[MovieCollectionSchema])
-def get_movie_collections(request, library_name: str):
-    library = PlexAPI.library.section(library_name)
-    collections = []
-    for collection in library.collections():
-        movies = []
-        for movie in collection.children:
-            if not movie.thumb:
-                print(movie.title, 'missing thumbnail!')
-            if not movie.art:
-                print(movie.title, 'missing background!')
-            movies.append({
-                "title": movie.title,
-                "poster": PlexAPI.transcodeImage(movie.thumbUrl, height=540, width=360, background='000000'),
-                "background": movie.artUrl
-            })
-        if not collection.thumb:
-            print(collection.title, 'missing thumbnail!')
-        if not collection.art:
-            print(collection.title, 'missing background!')
-        collections.append({
-            "title": collection.title,
-            "poster": PlexAPI.transcodeImage(collection.thumbUrl, height=540, width=360),
-            "background": collection.artUrl,
-            "movies": movies
-        })
-    return collections
-
-
-@api.get("/collections/show/{library_name}", response=list[ShowCollectionSchema])
-def get_show_collections(request, library_name: str):
-    library = PlexAPI.library.section(library_name)
-    collections = []
-    for collection in library.collections():
-        shows = []
-        for show in collection.children:
-            seasons = []
-            for season in show.seasons():
-                episodes = {episode.index: episode.thumb for episode in season.episodes()}
-                seasons.append({
-                    "season_number": season.index,
-                    "poster": season.thumbUrl,
-                    "background": season.artUrl,
-                    "episodes": episodes
-                })
-            shows.append({
-                "title": show.title,
-                "poster": show.thumbUrl,
-                "background": show.artUrl,
-                "seasons": seasons
-            })
-        collections.append({
-            "title": collection.title,
-            "poster": collection.thumbUrl,
-            "background": collection.artUrl,
-            "shows": shows
-        })
-    return collections
+async def query_servers(query: Callable[[PlexClient], list[dict]]) -> tuple[list[dict], list[dict]]:
+    """Run a query against every Plex server at once, waiting for each server no longer than its deadline.
+
+    Args:
+        query: Returns the items requested from a single server.
+
+    Returns:
+        Items returned by every server that responded in time, and the error of each server that didn't.
+        Servers that couldn't be reached are reconnected on their next query.
+    """
+    clients = list(PlexServers.values())
+    results = await asyncio.gather(*(
+        asyncio.wait_for(sync_to_async(query, thread_sensitive=False)(client), timeout=client.deadline)
+        for client in clients
+    ), return_exceptions=True)
+    items, errors = [], []
+    for client, result in zip(clients, results):
+        if isinstance(result, asyncio.TimeoutError):
+            result = f'Timed out after {client.deadline} seconds'
+        elif isinstance(result, requests.ConnectionError):
+            client.reset()
+        elif not isinstance(result, Exception):
+            items.extend(result)
+            continue
+        logger.warning(f"Plex server '{client.name}' left out of response: {result}")
+        errors.append({"server": client.name, "error": str(result)})
+    return items, errors
+
+
+"""
+* Endpoints
+"""
+
+
+@api.get("/movies/{library_name}", response=list[MovieSchema], exclude_unset=True)
+async def get_movies_in_library(
+    request,
+    response: HttpResponse,
+    library_name: str,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = None
+):
+    fingerprint, etag = await get_etag(request, library_name, ('movie',))
+    if is_not_modified(request, etag):
+        return set_etag(HttpResponse(status=304), etag)
+    set_etag(response, etag)
+    return await sync_to_async(get_movies, thread_sensitive=False)(
+        library_name, offset, limit, get_fields(fields), fingerprint)
+
+
+@api.get("/movies/{library_name}/stream")
+def stream_movies_in_library(
+    request,
+    library_name: str,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = None
+):
+    """Streams movies as newline-delimited JSON, one movie per line, as each page is fetched from Plex."""
+    if (snapshot := PlexCache.get(library_name, 'movies')) is not None:
+        movies = get_page(snapshot.items, offset, limit)
+    else:
+        library = PlexAPI.library.section(library_name)
+        movies = (get_movie_data(movie) for movie in iter_section_items(library, offset=offset, limit=limit))
+    fields = get_fields(fields)
+    return StreamingHttpResponse(
+        (MovieSchema(**movie).model_dump_json(include=fields) + '\n' for movie in movies),
+        content_type='application/x-ndjson')
+
+
+@api.get("/shows/{library_name}", response=list[ShowSchema], exclude_unset=True)
+async def get_shows_in_library(
+    request,
+    response: HttpResponse,
+    library_name: str,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = None,
+    depth: Depth = 'episode'
+):
+    """Returns the shows in a library section. Seasons and episodes are only fetched from Plex when requested
+    by both `depth` and `fields`."""
+    fields = get_fields(fields)
+    depth = get_depth(depth, fields)
+    fingerprint, etag = await get_etag(request, library_name, depth_libtypes[depth])
+    if is_not_modified(request, etag):
+        return set_etag(HttpResponse(status=304), etag)
+    set_etag(response, etag)
+    snapshot = await get_snapshot_async(
+        library_name, f'shows/{depth}', lambda library: build_shows(library, depth), fingerprint)
+    return trim_fields(get_page(snapshot.items, offset, limit), fields)
+
+
+@api.get("/collections/movie/{library_name}", response=list[MovieCollectionSchema], exclude_unset=True)
+async def get_movie_collections(request, response: HttpResponse, library_name: str, fields: Optional[str] = None):
+    """Returns the movie collections in a library section. Movies are only fetched from Plex when requested by
+    `fields`."""
+    fields = get_fields(fields)
+    movies = fields is None or 'movies' in fields
+    fingerprint, etag = await get_etag(request, library_name, ('collection', 'movie') if movies else ('collection',))
+    if is_not_modified(request, etag):
+        return set_etag(HttpResponse(status=304), etag)
+    set_etag(response, etag)
+    snapshot = await get_snapshot_async(
+        library_name, f'movie_collections/{int(movies)}',
+        lambda library: build_movie_collections(library, movies), fingerprint)
+    return trim_fields(snapshot.items, fields)
+
+
+@api.get("/collections/show/{library_name}", response=list[ShowCollectionSchema], exclude_unset=True)
+async def get_show_collections(
+    request,
+    response: HttpResponse,
+    library_name: str,
+    fields: Optional[str] = None,
+    depth: Depth = 'episode'
+):
+    """Returns the show collections in a library section. Shows, seasons, and episodes are only fetched from Plex
+    when requested by both `depth` and `fields`."""
+    fields = get_fields(fields)
+    depth = get_depth(depth, fields) if fields is None or 'shows' in fields else None
+    fingerprint, etag = await get_etag(
+        request, library_name, ('collection', *(depth_libtypes[depth] if depth else ())))
+    if is_not_modified(request, etag):
+        return set_etag(HttpResponse(status=304), etag)
+    set_etag(response, etag)
+    snapshot = await get_snapshot_async(
+        library_name, f'show_collections/{depth}',
+        lambda library: build_show_collections(library, depth), fingerprint)
+    return trim_fields(snapshot.items, fields)
+
+
+@api.get("/servers/movies", response=ServerMoviesSchema, exclude_unset=True)
+async def get_movies_on_servers(request, library: Optional[str] = None, fields: Optional[str] = None):
+    """Returns the movies in every movie library on every Plex server, tagged by server and library.
+
+    Servers that fail or don't respond within their deadline are listed in `errors` instead.
+    """
+    fields = get_fields(fields)
+    movies, errors = await query_servers(lambda client: get_server_movies(client, library))
+    return {
+        "movies": trim_fields(movies, fields if fields is None else fields | {'server', 'library'}),
+        "errors": errors
+    }
+
+
+@api.get("/servers/shows", response=ServerShowsSchema, exclude_unset=True)
+async def get_shows_on_servers(
+    request,
+    library: Optional[str] = None,
+    fields: Optional[str] = None,
+    depth: Depth = 'episode'
+):
+    """Returns the shows in every TV library on every Plex server, tagged by server and library.
+
+    Servers that fail or don't respond within their deadline are listed in `errors` instead.
+    """
+    fields = get_fields(fields)
+    depth = get_depth(depth, fields)
+    shows, errors = await query_servers(lambda client: get_server_shows(client, library, depth))
+    return {
+        "shows": trim_fields(shows, fields if fields is None else fields | {'server', 'library'}),
+        "errors": errors
+    }
+
+
+def search_library(
+    q: str = '',
+    filters: Optional[dict] = None,
+    offset: int = 0,
+    limit: int = 50
+) -> dict:
+    """Returns a page of mirrored items matching a search query, along with facet counts for every match."""
+    results, facets = get_index().search(q, filters)
+    return {
+        "total": len(results),
+        "results": [{
+            "rating_key": doc.rating_key,
+            "type": doc.type,
+            "library": doc.library,
+            "title": doc.title,
+            "year": doc.year,
+            "poster": get_proxy_url(doc.thumb) if doc.thumb and image_path_pattern.match(doc.thumb) else None,
+            "collections": doc.collections,
+            "missing": doc.missing,
+            "score": round(score, 4)
+        } for doc, score in get_page(results, offset, limit)],
+        "facets": facets
+    }
+
+
+@api.get("/search", response=SearchSchema)
+async def search(
+    request,
+    q: str = '',
+    type: Optional[Literal['movie', 'show', 'collection']] = None,
+    library: Optional[str] = None,
+    year: Optional[int] = None,
+    collection: Optional[str] = None,
+    missing: Optional[Literal['poster', 'background']] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """Searches the titles, years, and collection names of the movies, shows, and collections in the library
+    mirror, without querying Plex. Results can be filtered by any facet, and only cover libraries that have
+    been synced."""
+    filters = {'type': type, 'library': library, 'year': year, 'collection': collection, 'missing': missing}
+    return await sync_to_async(search_library, thread_sensitive=False)(q, filters, offset, limit)
+
+
+@api.get("/images/{rating_key}/{kind}/{timestamp}", url_name='plex_image')
+def get_image(
+    request,
+    rating_key: int,
+    kind: Literal['thumb', 'art', 'composite'],
+    timestamp: int,
+    width: int = Query(360, ge=1, le=3840),
+    height: int = Query(540, ge=1, le=3840)
+):
+    """Serves an image transcoded by Plex, fetching each size of each image version only once.
+
+    Plex image paths change whenever an image changes, so served images are cached by browsers indefinitely.
+    """
+    cache = get_image_cache()
+    key = f'{rating_key}/{kind}/{timestamp}/{width}x{height}'
+    if (image := cache.get(key) if cache else None) is None:
+        url = get_transcode_url(get_image_path(rating_key, kind, timestamp), width=width, height=height)
+        with PlexAPI.fetch(url) as r:
+            if r.status_code != 200:
+                return HttpResponse(status=404 if r.status_code == 404 else 502)
+            image = r.content, r.headers.get('Content-Type', 'image/jpeg')
+        if cache:
+            cache.set(key, *image)
+    response = HttpResponse(image[0], content_type=image[1])
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
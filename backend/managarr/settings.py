@@ -28,13 +28,10 @@ except (OSError, FileNotFoundError, ValueError):
         LOGR.error("Couldn't initialize Django project.")
         sys.exit()
 
-# Setup plex server connection
+# Setup plex server clients, each connects on first use
 PlexConfig = ENV.get('PLEX', {})
-PLEX_API = Plex.get_server(
-    url=PlexConfig.get('HOST'),
-    token=PlexConfig.get('TOKEN'),
-    port=PlexConfig.get('PORT')
-)
+PLEX_API = Plex.get_client(PlexConfig)
+PLEX_SERVERS = Plex.get_clients(PLEX_API, PlexConfig, ENV.get('PLEX_SERVERS') or [])
 
 # SECURITY WARNING: Must be kept secret in production!
 SECRET_KEY = ENV.get('DJANGO_SECRET', 'my-django-secret')
@@ -59,6 +56,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'managarr.utils.compress.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -100,6 +98,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Readers wait out a write in progress, the library mirror makes its own writes one at a time
+        'OPTIONS': {'timeout': 20}
     }
 }
 
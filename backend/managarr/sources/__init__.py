@@ -1,8 +1,8 @@
 """
 * Scraping Sources
 """
-# Local Imports
-from typing import Optional
+# Standard Library Imports
+from typing import Iterator, Optional
 
 # Third Party Imports
 from omnitils.logs import logger
@@ -14,58 +14,209 @@ import managarr.sources.mediux as Mediux
 import managarr.sources.themoviedb as MovieDB
 import managarr.sources.theposterdb as PosterDB
 from managarr.utils._schema import MovieCollection, TVShow
-from managarr.utils.scrape import get_page_soup
+from managarr.utils.pipeline import Pipeline, PipelineStage
+from managarr.utils.scrape import get_page_html, get_page_soup, get_soup
 
 
-def scrape_theposterdb(url: str | yarl.URL) -> Optional[MovieCollection | TVShow]:
-    """Scrapes one or more collections from a target PosterDB page."""
+"""
+* Types
+"""
+
+SourcePage = PosterDB.PosterDBPage | Mediux.MediuxPage
+
+"""
+* ThePosterDB
+"""
+
+
+def fetch_theposterdb(url: yarl.URL) -> Optional[tuple[yarl.URL, str]]:
+    """Fetch the HTML of a target PosterDB page, returned with the URL it was fetched from."""
 
     # Reroute poster page to parent collection
     if 'poster' in url.parts:
         url = PosterDB.get_set_from_poster(
-            soup=get_page_soup(url))
+            soup=get_page_soup(url, parse_only=PosterDB.poster_parse_only))
+        if url is None:
+            return logger.error('Unable to find the set containing this ThePosterDB poster!')
 
-    # Scrape a user page
+    # User pages list multiple sets
     if 'user' in url.parts:
-        return logger.error('User scraping is not currently implemented for ThePosterDB!')
+        return logger.error('ThePosterDB user pages must be expanded into their sets before fetching!')
 
     # Scrape a collection page
     if 'set' in url.parts:
-        soup = get_page_soup(url)
-        return PosterDB.PosterDBPage(settings.ENV.get('TMDB_TOKEN', ''), soup).get_collection()
+        return url, get_page_html(url)
 
     # Unrecognized ThePosterDB url
     return logger.error('Unrecognized ThePosterDB URL provided!')
 
 
-def scrape_mediux(url: str | yarl.URL) -> Optional[MovieCollection | TVShow]:
-    """Scrapes one or more collections from a target Mediux page."""
+def parse_theposterdb(html: str) -> PosterDB.PosterDBPage:
+    """Parse the HTML of a PosterDB set page."""
+    return PosterDB.PosterDBPage(
+        tmdb_token=settings.ENV.get('TMDB_TOKEN', ''),
+        soup=get_soup(html, parse_only=PosterDB.PosterDBPage.parse_only),
+        max_workers=settings.ENV.get('TMDB_WORKERS', 8))
+
+
+def scrape_theposterdb(url: str | yarl.URL) -> Optional[MovieCollection | TVShow]:
+    """Scrapes one or more collections from a target PosterDB page."""
+    if page := fetch_theposterdb(url):
+        return parse_theposterdb(page[1]).get_collection()
+
+
+def iter_theposterdb_user_sets(url: yarl.URL) -> Iterator[yarl.URL]:
+    """Yield the URL of each set uploaded by a PosterDB user, fetching every page of the user's uploads at once.
+
+    Args:
+        url: URL of a ThePosterDB user page.
+
+    Yields:
+        Unique set URLs, in the order their pages are fetched.
+    """
+    url = url.with_query(None)
+    first = get_page_soup(url, parse_only=PosterDB.user_parse_only)
+    if first is None:
+        return logger.error(f'Unable to retrieve page: {url}')
+
+    def _get_sets(n: int) -> list[yarl.URL]:
+        """Returns the sets listed on a page of the user's uploads."""
+        soup = first if n == 1 else get_page_soup(
+            url.with_query(page=n), parse_only=PosterDB.user_parse_only)
+        return PosterDB.get_sets_from_user_page(soup) if soup else []
+
+    # Fetch pages concurrently, requests are capped by the per-host limit
+    pages = Pipeline([PipelineStage(
+        'page', _get_sets, settings.ENV.get('BATCH', {}).get('FETCH', 8))])
+    seen = set()
+    for urls in pages.run(range(1, PosterDB.get_user_page_count(first) + 1)):
+        for n in urls:
+            if n not in seen:
+                seen.add(n)
+                yield n
+
+
+def iter_theposterdb_user(url: str | yarl.URL) -> Iterator[MovieCollection | TVShow]:
+    """Scrapes every set uploaded by a PosterDB user, yielding each collection as soon as it's built.
+
+    Args:
+        url: URL of a ThePosterDB user page.
+
+    Yields:
+        A movie collection or TV show for each set.
+    """
+    if isinstance(url, str):
+        url = yarl.URL(url)
+    config = settings.ENV.get('BATCH', {})
+    sets = Pipeline([
+        PipelineStage('fetch', fetch_theposterdb, config.get('FETCH', 8)),
+        PipelineStage('parse', lambda page: parse_theposterdb(page[1]), config.get('PARSE', 2)),
+        PipelineStage('resolve', lambda page: page.get_collection(), config.get('RESOLVE', 4))])
+    yield from sets.run(iter_theposterdb_user_sets(url))
+
+
+"""
+* Mediux
+"""
+
+
+def fetch_mediux(url: yarl.URL) -> Optional[tuple[yarl.URL, str]]:
+    """Fetch the HTML of a target Mediux page, returned with the URL it was fetched from."""
 
     # Recognized page?
     if 'sets' in url.parts:
-        soup = get_page_soup(url, ignore_status_code=True)
-        return Mediux.MediuxPage(soup).get_collection()
+        return url, get_page_html(url, ignore_status_code=True)
 
     # Unrecognized Mediux url
     return logger.error('Unrecognized Mediux URL provided!')
 
 
-def identify_and_scrape(url: str | yarl.URL) -> Optional[MovieCollection | TVShow]:
-    """Identify data source appropriate for the URL provided, then scrape data from it."""
+def parse_mediux(html: str) -> Mediux.MediuxPage:
+    """Parse the HTML of a Mediux set page."""
+    return Mediux.MediuxPage.from_html(html)
+
+
+def scrape_mediux(url: str | yarl.URL) -> Optional[MovieCollection | TVShow]:
+    """Scrapes one or more collections from a target Mediux page."""
+    if page := fetch_mediux(url):
+        return parse_mediux(page[1]).get_collection()
+
+
+"""
+* Identify Source
+"""
+
+
+def fetch_source(url: str | yarl.URL) -> Optional[tuple[yarl.URL, str]]:
+    """Identify data source appropriate for the URL provided, then fetch the page HTML from it.
+
+    Args:
+        url: URL of a ThePosterDB or Mediux page.
+
+    Returns:
+        Tuple containing the URL the page was fetched from and its HTML content, or None if the page is
+        unrecognized or couldn't be retrieved.
+    """
     if isinstance(url, str):
         url = yarl.URL(url)
 
     # ThePosterDB
-    if 'theposterdb.com' in url.host:
-        return scrape_theposterdb(url)
+    if 'theposterdb.com' in (url.host or ''):
+        page = fetch_theposterdb(url)
 
     # Mediux
-    elif 'mediux.pro' in url.host:
-        return scrape_mediux(url)
+    elif 'mediux.pro' in (url.host or ''):
+        page = fetch_mediux(url)
 
     # Return empty
+    else:
+        return logger.error("URL provided doesn't match a recognized source!")
+
+    # Check for missing page content
+    if page and page[1] is None:
+        return logger.error(f'Unable to retrieve page: {page[0]}')
+    return page
+
+
+def parse_source(url: yarl.URL, html: str) -> Optional[SourcePage]:
+    """Parse the HTML of a page fetched from a recognized source.
+
+    Args:
+        url: URL the page was fetched from.
+        html: HTML content of the page.
+
+    Returns:
+        A page object ready to build a collection from, or None if the source isn't recognized.
+    """
+    if 'theposterdb.com' in url.host:
+        return parse_theposterdb(html)
+    if 'mediux.pro' in url.host:
+        return parse_mediux(html)
     return logger.error("URL provided doesn't match a recognized source!")
 
 
+def is_user_page(url: yarl.URL) -> bool:
+    """Returns True if the URL points to a ThePosterDB user page listing multiple sets."""
+    return 'theposterdb.com' in (url.host or '') and 'user' in url.parts
+
+
+def identify_and_scrape(url: str | yarl.URL) -> Optional[MovieCollection | TVShow]:
+    """Identify data source appropriate for the URL provided, then scrape data from it.
+
+    Note:
+        ThePosterDB user pages list multiple sets, scrape them using `iter_theposterdb_user` instead.
+    """
+    if isinstance(url, str):
+        url = yarl.URL(url)
+    if is_user_page(url):
+        return logger.error("ThePosterDB user pages list multiple sets, use 'managarr get user' instead!")
+    if page := fetch_source(url):
+        if parsed := parse_source(*page):
+            return parsed.get_collection()
+
+
 # Export namespace
-__all__ = ['Mediux', 'MovieDB', 'PosterDB', 'identify_and_scrape']
+__all__ = [
+    'Mediux', 'MovieDB', 'PosterDB', 'SourcePage',
+    'fetch_source', 'parse_source', 'is_user_page',
+    'iter_theposterdb_user', 'iter_theposterdb_user_sets', 'identify_and_scrape']
@@ -5,12 +5,11 @@
 from typing import Optional, Union
 
 # Third Party Imports
-from bs4 import BeautifulSoup
 from omnitils.logs import logger
 from omnitils.properties import default_prop
 
 # Local Imports
-from managarr.utils.scrape import parse_json_string
+from managarr.utils.scrape import iter_scripts, parse_json_string
 from managarr.utils._schema import Movie, MovieCollection, TVShow, TVSeason, TVEpisode, MediaTypes, MediaSources
 
 """
@@ -19,6 +18,26 @@ from managarr.utils._schema import Movie, MovieCollection, TVShow, TVSeason, TVE
 
 CollectionType = Union[MediaTypes.MovieCollection, MediaTypes.TVShow, None]
 
+"""
+* Page Data
+"""
+
+
+def get_page_data(html: str) -> dict:
+    """Returns a dictionary of data relating to a Mediux collection, extracted from raw page HTML.
+
+    Args:
+        html: HTML content of a Mediux set page.
+
+    Returns:
+        Dictionary of set data, empty if no set data was found.
+    """
+    for script in iter_scripts(html):
+        if 'files' in script and 'set' in script and 'Set Link\\' not in script:
+            return parse_json_string(script)['set']
+    return {}
+
+
 """
 * Classes
 """
@@ -27,53 +46,75 @@ CollectionType = Union[MediaTypes.MovieCollection, MediaTypes.TVShow, None]
 class MediuxPage:
     url_formula = "https://api.mediux.pro/assets/{}"
 
-    def __init__(self, soup: BeautifulSoup):
-        self.soup = soup
+    def __init__(self, data: dict):
+        self.data = data
 
-        # Get collection data and image files
-        self.data = self.get_page_data()
-        self.files = self.data.get('files', []).copy()
+        # Get collection image files, indexed by what they belong to
+        self.files: list[dict] = self.data.get('files', [])
+        self.set_files: dict[str, str] = {}
+        self.season_files: dict[str, dict[str, str]] = {}
+        self.episode_files: dict[int, dict[str, str]] = {}
+        self.movie_files: dict[str, dict[str, str]] = {}
+        self.classify_files()
 
         # Check for a recognized collection type
         self.page_type: CollectionType = self.get_collection_type()
         if not self.page_type:
             return
 
-    def get_page_data(self) -> dict:
-        """Returns a dictionary of data relating to this Mediux collection."""
-        for script in self.soup.find_all('script'):
-            if 'files' in script.text and 'set' in script.text and 'Set Link\\' not in script.text:
-                return parse_json_string(script.text)['set']
-        return {}
+    @classmethod
+    def from_html(cls, html: str) -> 'MediuxPage':
+        """Returns a MediuxPage built from the raw HTML of a Mediux set page."""
+        return cls(get_page_data(html))
+
+    def classify_files(self) -> None:
+        """Index each image file by the show, season, episode, or movie it belongs to.
+
+        Posters and backdrops are stored under the 'poster' and 'backdrop' keys of their owner's dictionary, title
+        cards are stored by episode ID under their season number. Files not owned by a season, episode, or movie
+        belong to the main show or collection.
+        """
+        for f in self.files:
+            role = 'backdrop' if f['fileType'] == 'backdrop' else 'poster'
+            episode = f.get('episode_id') or {}
+            season = f.get('season_id') or {}
+            movie = f.get('movie_id') or f.get('movie_id_backdrop') or {}
+
+            # Episode title card
+            if f['fileType'] == 'title_card':
+                season_num = (episode.get('season_id') or {}).get('season_number')
+                if season_num is not None and episode.get('id') is not None:
+                    self.episode_files.setdefault(season_num, {})[episode['id']] = f['id']
+
+            # Season poster or backdrop
+            elif season.get('id'):
+                self.season_files.setdefault(season['id'], {})[role] = f['id']
+
+            # Movie poster or backdrop
+            elif movie.get('id') is not None:
+                if movie['id'] in self.movie_data:
+                    self.movie_files.setdefault(movie['id'], {})[role] = f['id']
+
+            # Show or collection poster or backdrop
+            else:
+                self.set_files[role] = f['id']
 
     def get_collection_type(self) -> CollectionType:
         """Returns the type of mediux page this is (movie or show)."""
-        for f in self.files:
-            if any([f["show_id"], f["show_id_backdrop"], f["episode_id"], f["season_id"], f["show_id"]]):
-                if self.data.get('show'):
-                    return MediaTypes.TVShow
+        if self.data.get('show') and any([self.set_files, self.season_files, self.episode_files]):
+            return MediaTypes.TVShow
         if self.data.get('collection') and self.data['collection'].get('movies'):
             return MediaTypes.MovieCollection
         return
 
+    def get_url(self, asset: Optional[str]) -> Optional[str]:
+        """Returns the URL of an image file, or None if no image file is provided."""
+        return self.url_formula.format(asset) if asset else None
+
     """
     * TV Objects
     """
 
-    @default_prop
-    def episode_data(self) -> dict[int, list]:
-        """A dictionary of season numbers mapped to a list of episode IDs."""
-        _episodes = {}
-        for f in self.files:
-            if f['fileType'] != 'title_card':
-                continue
-            _episode_id = (f.get('episode_id') or {}).get('id')
-            _season_num = ((f.get("episode_id") or {}).get("season_id") or {}).get("season_number")
-            if _season_num is None or _episode_id is None:
-                continue
-            _episodes.setdefault(_season_num, []).append((_episode_id, f['id']))
-        return _episodes
-
     @default_prop
     def season_data(self) -> dict:
         """A dictionary of season ID's mapped to numbers and episodes."""
@@ -87,56 +128,33 @@ class MediuxPage:
     def get_tv_seasons(self) -> list[TVSeason]:
         """Returns a list of TVSeason objects."""
         seasons = []
-
-        # Grab raw data for all seasons
-        _seasons = [
-            _f for _f in self.files
-            if _f.get('season_id') and _f['season_id'].get('id')]
-        [self.files.remove(n) for n in _seasons]
-
-        # Build list of seasons
-        for f in _seasons:
-
-            # Get season data
-            _season_id = f["season_id"]["id"]
-            _season = self.season_data.get(_season_id)
-            _season_num = _season['number']
-
-            # Get poster and background
-            background, poster = None, None
-            if f['fileType'] == 'backdrop':
-                background = self.url_formula.format(f['id'])
-            else:
-                poster = self.url_formula.format(f['id'])
+        for _season_id, _files in self.season_files.items():
+            if not (_season := self.season_data.get(_season_id)):
+                continue
 
             # Add season
             seasons.append(
                 TVSeason(
-                    number=_season_num,
-                    url_poster=poster,
-                    url_background=background,
+                    number=_season['number'],
+                    url_poster=self.get_url(_files.get('poster')),
+                    url_background=self.get_url(_files.get('backdrop')),
                     source=MediaSources.Mediux,
                     episodes=self.get_tv_episodes(
-                        _season_id, _season_num)
+                        _season_id, _season['number'])
                 ))
-        return seasons
+        return sorted(seasons, key=lambda x: x.number)
 
     def get_tv_episodes(self, season_id: str, season_num: int) -> list[TVEpisode]:
         """Returns a list of TVEpisode objects for a given TVSeason."""
         _season_data = self.season_data.get(season_id, {})
-        if not _season_data:
+        _cards = self.episode_files.get(season_num, {})
+        if not _season_data or not _cards:
             return []
 
-        # Raw episodes
-        _eps = {
-            _e['id']: _e['episode_number']
-            for _e in _season_data['episodes']}
-
         # Sorted episode URLs
-        _episodes = dict(sorted({
-            _eps[_id]: self.url_formula.format(_asset)
-            for _id, _asset in self.episode_data.get(season_num, [])
-        }.items()))
+        _episodes = sorted(
+            (_e['episode_number'], self.get_url(_cards[_e['id']]))
+            for _e in _season_data['episodes'] if _e['id'] in _cards)
 
         # List of TVEpisode objects
         return [
@@ -144,58 +162,40 @@ class MediuxPage:
                 number=num,
                 url_title_card=url,
                 source=MediaSources.Mediux
-            ) for num, url in _episodes.items()
+            ) for num, url in _episodes
         ]
 
     """
     * Movie Objects
     """
 
+    @default_prop
+    def movie_data(self) -> dict[str, dict]:
+        """A dictionary of movie ID's mapped to movie details."""
+        return {m['id']: m for m in (self.data.get("collection") or {}).get("movies") or []}
+
     def get_movies(self) -> list[Movie]:
         """Returns a list of Movie objects."""
-        movies: dict[str, Movie] = {}
-        _movies = {m['id']: m for m in (self.data.get("collection") or {}).get("movies") or []}
-        for f in self.files:
-
-            # Get ID and title
-            id_tmdb = (f.get("movie_id") or {}).get("id")
-            title = _movies.get(id_tmdb)['title']
-            if not title:
+        movies = []
+        for id_tmdb, _files in self.movie_files.items():
+            _movie = self.movie_data[id_tmdb]
+            if not _movie.get('title'):
                 continue
 
-            # Get image URL
-            url_poster, url_background = None, None
-            url = self.url_formula.format(f['id'])
-            if f['fileType'] == 'backdrop':
-                url_background = url
-            else:
-                url_poster = url
-
-            # Join existing if present
-            if id_tmdb in movies:
-                if not movies[id_tmdb].url_background and url_background:
-                    movies[id_tmdb].url_background = url_background
-                    continue
-                if not movies[id_tmdb].url_poster and url_poster:
-                    movies[id_tmdb].url_poster = url_poster
-                    continue
-
             # Get release year
-            year = _movies.get(id_tmdb)['release_date']
+            year = _movie.get('release_date')
             if year is not None:
                 year = int(year[:4])
 
             # Add movie
-            movies[id_tmdb] = Movie(
-                title=title,
+            movies.append(Movie(
+                title=_movie['title'],
                 year=year,
                 id_tmdb=id_tmdb,
-                url_poster=url_poster,
-                url_background=url_background,
-                source=MediaSources.Mediux)
-
-        # Join background and posters
-        return [v for v in movies.values()]
+                url_poster=self.get_url(_files.get('poster')),
+                url_background=self.get_url(_files.get('backdrop')),
+                source=MediaSources.Mediux))
+        return movies
 
     """
     * Collection Objects
@@ -211,49 +211,23 @@ class MediuxPage:
         except (IndexError, ValueError, KeyError, TypeError):
             year = None
 
-        # Get show images
-        remove, background, poster = [], None, None
-        for i, f in enumerate(self.files):
-            if f['fileType'] == 'backdrop':
-                remove.append(i)
-                background = self.url_formula.format(f['id'])
-            elif f["show_id"] is not None:
-                remove.append(i)
-                poster = self.url_formula.format(f['id'])
-        [self.files.pop(i) for i in remove]
-
         # Return TV Show object
         return TVShow(
             title=show_data['name'],
             year=year,
             seasons=self.get_tv_seasons(),
-            url_background=background,
-            url_poster=poster,
+            url_background=self.get_url(self.set_files.get('backdrop')),
+            url_poster=self.get_url(self.set_files.get('poster')),
             id_tmdb=show_data['id'],
             source=MediaSources.Mediux
         )
 
     def get_movie_collection(self) -> MovieCollection:
         """Returns a MovieCollection object."""
-
-        # Get movie collection title
-        title = self.data["collection"]["collection_name"]
-
-        # Get movie collection images
-        remove, background, poster = [], None, None
-        for i, f in enumerate(self.files):
-            if f['fileType'] == 'backdrop':
-                remove.append(i)
-                background = self.url_formula.format(f['id'])
-            elif f['fileType'] == 'poster' and f["movie_id"] is None:
-                remove.append(i)
-                poster = self.url_formula.format(f['id'])
-        [self.files.pop(i) for i in remove]
-
         return MovieCollection(
-            title=title,
-            url_background=background,
-            url_poster=poster,
+            title=self.data["collection"]["collection_name"],
+            url_background=self.get_url(self.set_files.get('backdrop')),
+            url_poster=self.get_url(self.set_files.get('poster')),
             source=MediaSources.Mediux,
             movies=self.get_movies()
         )
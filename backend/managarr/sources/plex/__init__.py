@@ -3,3 +3,4 @@
 """
 from managarr.sources.plex.core import *
 from managarr.sources.plex.schemas import *
+from managarr.sources.plex.snapshot import *
@@ -2,24 +2,145 @@
 * Retrieve Data from Plex
 """
 # Standard Library Imports
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
 
 # Third Party Imports
+import requests
 import yarl
+from plexapi.base import PlexObject
+from plexapi.library import LibrarySection
 from plexapi.server import PlexServer
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Local Imports
+from managarr import settings
+
+# Generic types
+T = TypeVar('T')
+R = TypeVar('R')
+
+"""
+* Classes
+"""
+
+
+class PlexClient:
+    """A Plex server connection shared between threads, which connects on first use rather than when created.
+
+    If connecting fails, the next use tries to connect again, and requests that can't reach a connected server
+    call `reset()` so the following use reconnects. Attributes of the connected `PlexServer` are available on
+    the client itself, e.g. `client.library` or `client.url()`, so the client's own connection settings are
+    kept private.
+
+    Args:
+        url: Plex server URL.
+        token: Plex server token.
+        port: Plex server port.
+        pool_size: Max keep-alive connections kept open to the server.
+        retries: Retries made on connection errors and 5xx responses.
+        timeout: Request timeout in seconds.
+        name: Name the server is tagged with when querying every server at once.
+        deadline: Max seconds to wait for the server when querying every server at once.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        token: str,
+        port: Optional[int | str] = None,
+        pool_size: int = 16,
+        retries: int = 3,
+        timeout: int = 30,
+        name: str = 'default',
+        deadline: float = 10
+    ):
+        self.name = name
+        self.deadline = deadline
+        self._url = url
+        self._token = token
+        self._port = port
+        self._pool_size = pool_size
+        self._retries = retries
+        self._timeout = timeout
+        self._lock = Lock()
+        self._server: Optional[PlexServer] = None
+        self._session: Optional[requests.Session] = None
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.server, name)
+
+    @property
+    def connected(self) -> bool:
+        """Whether the client has connected to the server."""
+        return self._server is not None
+
+    @property
+    def session(self) -> requests.Session:
+        """Session which pools keep-alive connections to the server and retries transient failures."""
+        if self._session is None:
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=self._pool_size,
+                max_retries=Retry(
+                    total=self._retries,
+                    backoff_factor=0.5,
+                    status_forcelist=(500, 502, 503, 504),
+                    allowed_methods=frozenset({'GET', 'HEAD'}),
+                    raise_on_status=False))
+            self._session = requests.Session()
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
+        return self._session
+
+    @property
+    def server(self) -> PlexServer:
+        """The connected Plex server, connecting to it if the client isn't connected yet."""
+        with self._lock:
+            if self._server is None:
+                self._server = get_server(
+                    self._url, self._token, self._port, session=self.session, timeout=self._timeout)
+            return self._server
+
+    def fetch(self, url: str, **kwargs) -> requests.Response:
+        """Make a GET request to a URL of the server, e.g. a transcoded image, using the client's pooled session.
+
+        Args:
+            url: Full URL to request, including the token if the server requires one.
+            kwargs: Additional arguments passed to the session's request.
+        """
+        return self.session.get(url, timeout=self._timeout, **kwargs)
+
+    def reset(self) -> None:
+        """Drop the current connection, so the next use connects to the server again."""
+        with self._lock:
+            self._server = None
+
 
 """
 * Funcs
 """
 
 
-def get_server(url: str, token: str, port: Optional[int | str] = None) -> PlexServer:
+def get_server(
+    url: str,
+    token: str,
+    port: Optional[int | str] = None,
+    session: Optional[requests.Session] = None,
+    timeout: int = 30
+) -> PlexServer:
     """Return a PlexServer object using the provided credentials.
 
     Args:
         url (str): Plex server URL.
         port (int | str): Plex server port.
         token (str): Plex server token.
+        session: Session used for requests made to the server, plexapi creates its own if not provided.
+        timeout: Request timeout in seconds.
 
     Returns:
         A PlexServer object.
@@ -30,9 +151,104 @@ def get_server(url: str, token: str, port: Optional[int | str] = None) -> PlexSe
     return PlexServer(
         baseurl=str(url),
         token=token,
-        timeout=30)
+        session=session,
+        timeout=timeout)
+
+
+def get_client(config: dict) -> PlexClient:
+    """Return a lazily connected Plex client using the PLEX settings of the project environment."""
+    return PlexClient(
+        url=config.get('HOST'),
+        token=config.get('TOKEN'),
+        port=config.get('PORT'),
+        pool_size=config.get('POOL_SIZE', 16),
+        retries=config.get('RETRIES', 3),
+        timeout=config.get('TIMEOUT', 30),
+        name=config.get('NAME', 'default'),
+        deadline=config.get('DEADLINE', 10))
+
+
+def get_clients(default: PlexClient, config: dict, servers: list[dict]) -> dict[str, PlexClient]:
+    """Return a lazily connected Plex client for the default server and each additional server.
+
+    Args:
+        default: Client of the default server.
+        config: PLEX settings of the default server, additional servers use these for any setting they omit.
+        servers: PLEX_SERVERS settings of each additional server.
+
+    Returns:
+        Dictionary of clients by server name.
+    """
+    clients = {default.name: default}
+    for i, server in enumerate(servers, start=1):
+        client = get_client({**config, 'NAME': server.get('HOST', f'server-{i}'), **server})
+        if client.name in clients:
+            raise ValueError(f"Plex server name '{client.name}' is used more than once!")
+        clients[client.name] = client
+    return clients
 
 
 def get_libraries(plex: PlexServer):
     """Return all libraries for a provided Plex server."""
     return [n for n in plex.library.sections()]
+
+
+"""
+* Bulk Section Data
+"""
+
+
+def get_container_size() -> int:
+    """Returns the number of items requested from Plex per page when walking a whole library section."""
+    return settings.ENV.get('PLEX', {}).get('CONTAINER_SIZE', 1000)
+
+
+def get_max_workers() -> int:
+    """Returns the max number of requests made to Plex at once when fanning out independent calls."""
+    return settings.ENV.get('PLEX', {}).get('WORKERS', 8)
+
+
+def map_concurrent(func: Callable[[T], R], items: Iterable[T]) -> list[R]:
+    """Call a function for each item over a bounded pool of threads, for independent Plex calls.
+
+    Args:
+        func: Function to call for each item.
+        items: Items to call the function for.
+
+    Returns:
+        The result for each item, in the order the items were provided.
+    """
+    items = list(items)
+    if len(items) < 2:
+        return [func(n) for n in items]
+    with ThreadPoolExecutor(max_workers=min(get_max_workers(), len(items))) as executor:
+        return list(executor.map(func, items))
+
+
+def iter_section_items(
+    section: LibrarySection,
+    libtype: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None
+) -> Iterator[PlexObject]:
+    """Yield the items in a library section one page at a time, so each page is available as soon as it arrives.
+
+    Args:
+        section: Plex library section.
+        libtype: Type of item to yield, defaults to the section's own type.
+        offset: Number of items to skip.
+        limit: Max number of items to yield, yields every remaining item if not provided.
+
+    Yields:
+        Each item in the section, in the section's default order.
+    """
+    size, start, remaining = get_container_size(), offset, limit
+    while remaining is None or remaining > 0:
+        size = size if remaining is None else min(size, remaining)
+        page = section.search(libtype=libtype, container_start=start, container_size=size, maxresults=size)
+        yield from page
+        if len(page) < size:
+            break
+        start += len(page)
+        if remaining is not None:
+            remaining -= len(page)
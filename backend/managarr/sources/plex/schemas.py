@@ -7,41 +7,104 @@ from omnitils.schema import Schema
 * Schemas
 """
 
+# Every field has a default, so endpoints serving sparse fieldsets can omit any field
+
 
 class EpisodeSchema(Schema):
-    episode_number: int
-    poster: str | None
+    episode_number: int | None = None
+    poster: str | None = None
 
 
 class SeasonSchema(Schema):
-    season_number: int
-    poster: str | None
-    background: str | None
-    episodes: dict[int, str]  # Dictionary with episode number as key and poster as value
+    season_number: int | None = None
+    poster: str | None = None
+    background: str | None = None
+    episodes: dict[int, str] = {}  # Dictionary with episode number as key and poster as value
 
 
 class ShowSchema(Schema):
-    title: str
-    poster: str | None
-    background: str | None
-    seasons: list[SeasonSchema]
+    title: str | None = None
+    poster: str | None = None
+    background: str | None = None
+    seasons: list[SeasonSchema] = []
 
 
 class MovieSchema(Schema):
-    title: str
-    poster: str | None
-    background: str | None
+    title: str | None = None
+    poster: str | None = None
+    background: str | None = None
 
 
 class MovieCollectionSchema(Schema):
-    title: str
-    poster: str | None
-    background: str | None
-    movies: list[MovieSchema]
+    title: str | None = None
+    poster: str | None = None
+    background: str | None = None
+    movies: list[MovieSchema] = []
 
 
 class ShowCollectionSchema(Schema):
+    title: str | None = None
+    poster: str | None = None
+    background: str | None = None
+    shows: list[ShowSchema] = []
+
+
+"""
+* Server Schemas
+"""
+
+
+class ServerMovieSchema(MovieSchema):
+    server: str | None = None
+    library: str | None = None
+
+
+class ServerShowSchema(ShowSchema):
+    server: str | None = None
+    library: str | None = None
+
+
+class ServerErrorSchema(Schema):
+    server: str
+    error: str
+
+
+class ServerMoviesSchema(Schema):
+    movies: list[ServerMovieSchema] = []
+    errors: list[ServerErrorSchema] = []
+
+
+class ServerShowsSchema(Schema):
+    shows: list[ServerShowSchema] = []
+    errors: list[ServerErrorSchema] = []
+
+
+"""
+* Search Schemas
+"""
+
+
+class SearchResultSchema(Schema):
+    rating_key: int
+    type: str
+    library: str
     title: str
-    poster: str | None
-    background: str | None
-    shows: list[ShowSchema]
+    year: int | None = None
+    poster: str | None = None
+    collections: list[str] = []
+    missing: list[str] = []  # Artwork the item has no image for, 'poster' or 'background'
+    score: float
+
+
+class SearchFacetsSchema(Schema):
+    type: dict[str, int] = {}
+    library: dict[str, int] = {}
+    year: dict[int, int] = {}
+    collection: dict[str, int] = {}
+    missing: dict[str, int] = {}
+
+
+class SearchSchema(Schema):
+    total: int
+    results: list[SearchResultSchema] = []
+    facets: SearchFacetsSchema
@@ -0,0 +1,219 @@
+"""
+* Plex Library Search
+"""
+# Standard Library Imports
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Iterator, Optional
+
+# Third Party Imports
+from django.db.models import Max
+
+# Local Imports
+from managarr.models import Collection, CollectionItem, Movie, Section, Show, SyncState
+from managarr.sources.plex.sync import get_mirror
+
+# Search index, built on first use
+_index: Optional['SearchIndex'] = None
+_index_lock = Lock()
+
+# Words in a title or query
+word_pattern = re.compile(r'\w+')
+
+# Weight of a query term matching each field of an item
+field_weights: dict[str, float] = {
+    'title': 3,
+    'year': 2,
+    'collection': 1
+}
+
+# Weight of a query term matching the start of a word rather than the whole word
+PREFIX_WEIGHT = 0.5
+
+# Facets counted for search results, in order
+facet_names = ('type', 'library', 'year', 'collection', 'missing')
+
+# Max values listed for each facet
+FACET_SIZE = 20
+
+"""
+* Classes
+"""
+
+
+@dataclass
+class SearchDocument:
+    """A mirrored item indexed for search."""
+    rating_key: int
+    type: str
+    library: str
+    title: str
+    title_sort: str
+    year: Optional[int]
+    thumb: Optional[str]
+    art: Optional[str]
+    collections: list[str] = field(default_factory=list)
+
+    @property
+    def missing(self) -> list[str]:
+        """Artwork the item has no image for."""
+        return [n for n, path in (('poster', self.thumb), ('background', self.art)) if not path]
+
+    def get_facet(self, name: str) -> list:
+        """Returns the values of a facet for this item."""
+        match name:
+            case 'collection':
+                return self.collections
+            case 'missing':
+                return self.missing
+            case _:
+                value = getattr(self, name)
+                return [] if value is None else [value]
+
+
+class SearchIndex:
+    """An in-memory inverted index of the movies, shows, and collections in the library mirror.
+
+    Args:
+        documents: Items to index.
+        version: Version of the mirror the items were read from.
+    """
+
+    def __init__(self, documents: list[SearchDocument], version: tuple = ()):
+        self.documents = documents
+        self.version = version
+        self.postings: dict[str, dict[str, set[int]]] = {n: defaultdict(set) for n in field_weights}
+        for i, doc in enumerate(documents):
+            for word in tokenize(doc.title):
+                self.postings['title'][word].add(i)
+            if doc.year is not None:
+                self.postings['year'][str(doc.year)].add(i)
+            for name in doc.collections:
+                for word in tokenize(name):
+                    self.postings['collection'][word].add(i)
+        self.words = {n: sorted(postings) for n, postings in self.postings.items()}
+        self.titles = [' '.join(tokenize(doc.title)) for doc in documents]
+
+    def iter_prefixed(self, name: str, prefix: str) -> Iterator[str]:
+        """Yield every word indexed for a field which starts with a prefix, other than the prefix itself."""
+        words = self.words[name]
+        for i in range(bisect_left(words, prefix), len(words)):
+            if not words[i].startswith(prefix):
+                break
+            if words[i] != prefix:
+                yield words[i]
+
+    def score_term(self, term: str) -> dict[int, float]:
+        """Returns the score of every item matching a query term, as a whole word or the start of a word."""
+        scores: dict[int, float] = defaultdict(float)
+        total = len(self.documents)
+        for name, weight in field_weights.items():
+            postings = self.postings[name]
+            matches = [(term, weight)] if term in postings else []
+            if name != 'year':
+                matches.extend((n, weight * PREFIX_WEIGHT) for n in self.iter_prefixed(name, term))
+            for word, w in matches:
+                idf = math.log(1 + total / len(postings[word]))
+                for i in postings[word]:
+                    scores[i] += w * idf
+        return scores
+
+    def search(self, query: str, filters: Optional[dict] = None) -> tuple[list[tuple[SearchDocument, float]], dict]:
+        """Search for items matching every term of a query.
+
+        Args:
+            query: Search query, returns every item in title order if empty.
+            filters: Value required for each facet, e.g. {'type': 'movie', 'missing': 'poster'}.
+
+        Returns:
+            Matching items with their scores, best matches first, and the number of matching items with each
+            value of each facet. Facet counts ignore the facet's own filter, so every value of a filtered facet
+            is still listed.
+        """
+        filters = {k: v for k, v in (filters or {}).items() if v is not None}
+        terms = tokenize(query)
+
+        # Score items matching every term
+        if terms:
+            scores = self.score_term(terms[0])
+            for term in terms[1:]:
+                term_scores = self.score_term(term)
+                scores = {i: s + term_scores[i] for i, s in scores.items() if i in term_scores}
+        else:
+            scores = dict.fromkeys(range(len(self.documents)), 0.0)
+
+        # Boost items whose title matches the query as a whole
+        normal = ' '.join(terms)
+        for i in scores if terms else ():
+            if self.titles[i] == normal:
+                scores[i] += 10
+            elif self.titles[i].startswith(normal):
+                scores[i] += 5
+
+        # Count facets, ignoring each facet's own filter
+        facets: dict[str, Counter] = {n: Counter() for n in facet_names}
+        results = []
+        for i, score in scores.items():
+            doc = self.documents[i]
+            failed = [n for n, v in filters.items() if v not in doc.get_facet(n)]
+            if not failed:
+                results.append((doc, score))
+            for name in facet_names:
+                if not failed or failed == [name]:
+                    facets[name].update(doc.get_facet(name))
+        results.sort(key=lambda n: (-n[1], n[0].title_sort))
+        return results, {n: dict(c.most_common(FACET_SIZE)) for n, c in facets.items()}
+
+
+"""
+* Index
+"""
+
+
+def tokenize(text: str) -> list[str]:
+    """Returns the words in a text, lowercased and stripped of accents."""
+    text = ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+    return word_pattern.findall(text.lower())
+
+
+def get_version() -> tuple:
+    """Returns the version of the library mirror, which changes whenever items are synced."""
+    return get_mirror().generation, SyncState.objects.aggregate(synced=Max('synced'))['synced']
+
+
+def build_index(version: tuple = ()) -> SearchIndex:
+    """Returns a search index of every movie, show, and collection in the library mirror."""
+    libraries = dict(Section.objects.values_list('id', 'title'))
+    collections: dict[int, list[str]] = defaultdict(list)
+    for key, name in CollectionItem.objects.values_list('rating_key', 'collection__title'):
+        collections[key].append(name)
+    documents = [
+        SearchDocument(
+            rating_key=row['rating_key'],
+            type=libtype,
+            library=libraries.get(row['section_id'], ''),
+            title=row['title'],
+            title_sort=row['title_sort'],
+            year=row['year'],
+            thumb=row['thumb'],
+            art=row['art'],
+            collections=collections.get(row['rating_key'], []))
+        for libtype, model in (('movie', Movie), ('show', Show), ('collection', Collection))
+        for row in model.objects.values(
+            'rating_key', 'section_id', 'title', 'title_sort', 'year', 'thumb', 'art')]
+    return SearchIndex(documents, version)
+
+
+def get_index() -> SearchIndex:
+    """Returns the search index, rebuilding it if the library mirror changed since it was built."""
+    global _index
+    version = get_version()
+    with _index_lock:
+        if _index is None or _index.version != version:
+            _index = build_index(version)
+        return _index
@@ -0,0 +1,275 @@
+"""
+* Plex Library Snapshot Cache
+"""
+# Standard Library Imports
+import re
+from threading import Lock
+from time import monotonic
+from typing import Callable, Optional, Protocol
+
+# Third Party Imports
+from omnitils.logs import logger
+
+# Plex metadata type number of a collection
+COLLECTION_TYPE = 18
+
+# Matches the ratingKey in a Plex metadata key
+metadata_key_pattern = re.compile(r'^/library/metadata/(\d+)')
+
+"""
+* Types
+"""
+
+
+class AlertListener(Protocol):
+    """A running listener thread, e.g. `plexapi.alert.AlertListener`."""
+
+    def is_alive(self) -> bool: ...
+
+
+class AlertSource(Protocol):
+    """Anything which can stream Plex notification alerts, e.g. a `PlexServer`."""
+
+    def startAlertListener(
+        self,
+        callback: Optional[Callable[[dict], None]] = None,
+        callbackError: Optional[Callable[[Exception], None]] = None
+    ) -> AlertListener: ...
+
+
+"""
+* Classes
+"""
+
+
+class Snapshot:
+    """The response data of a library endpoint, captured for a single library section.
+
+    Args:
+        section_id: ID of the library section the data was built from.
+        items: Response data.
+        keys: ratingKeys of every Plex item the data was built from. If not provided, the data covers the whole
+            section and any change in the section invalidates it.
+        fingerprint: Fingerprint of the library section when the data was built, if known.
+    """
+
+    def __init__(
+        self,
+        section_id: int,
+        items: list[dict],
+        keys: Optional[set[int]] = None,
+        fingerprint: Optional[str] = None
+    ):
+        self.section_id = section_id
+        self.items = items
+        self.keys = keys
+        self.fingerprint = fingerprint
+        self.created = monotonic()
+
+    def is_affected(self, section_id: Optional[int], key: Optional[int], item_type: Optional[int] = None) -> bool:
+        """Returns True if a change to a Plex item could make this snapshot stale.
+
+        Args:
+            section_id: ID of the library section the item belongs to, if known.
+            key: ratingKey of the item, if known.
+            item_type: Plex metadata type number of the item, if known.
+        """
+        if key is not None and self.keys is not None and key in self.keys:
+            return True
+        if section_id != self.section_id:
+            return False
+        return key is None or self.keys is None or item_type == COLLECTION_TYPE
+
+
+class SnapshotCache:
+    """An in-memory cache of library endpoint data, invalidated by Plex notification alerts.
+
+    While the alert listener is running, snapshots are kept until an alert reports a change to an item they
+    contain (or to their section, for snapshots covering a whole section). While the listener is down, snapshots
+    expire after `ttl` seconds instead, and the listener is restarted at most once every `restart_delay` seconds.
+
+    Args:
+        source: Source of Plex notification alerts, no alerts are listened for if not provided.
+        ttl: Seconds a snapshot is kept while the alert listener is down.
+        restart_delay: Min seconds between attempts to start the alert listener.
+        clock: Returns the current time in seconds, used to expire snapshots.
+    """
+
+    def __init__(
+        self,
+        source: Optional[AlertSource] = None,
+        ttl: float = 300,
+        restart_delay: float = 60,
+        clock: Callable[[], float] = monotonic
+    ):
+        self.source = source
+        self.ttl = ttl
+        self.restart_delay = restart_delay
+        self.clock = clock
+        self.lock = Lock()
+        self.snapshots: dict[tuple[str, str], Snapshot] = {}
+        self.listener: Optional[AlertListener] = None
+        self.listener_failed = False
+        self.listener_started = float('-inf')
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hits, misses, and invalidated snapshots since the cache was created."""
+        return {'hits': self.hits, 'misses': self.misses, 'invalidated': self.invalidated}
+
+    @property
+    def listening(self) -> bool:
+        """Whether the alert listener is currently running."""
+        return self.listener is not None and not self.listener_failed and self.listener.is_alive()
+
+    """
+    * Alert Listener
+    """
+
+    def start_listener(self) -> bool:
+        """Start the alert listener if it isn't running, no more than once every `restart_delay` seconds.
+
+        Returns:
+            True if the listener is running.
+        """
+        if self.source is None or self.listening:
+            return self.listening
+        with self.lock:
+            now = self.clock()
+            if now - self.listener_started < self.restart_delay:
+                return False
+            self.listener_started = now
+        try:
+            self.listener_failed = False
+            self.listener = self.source.startAlertListener(
+                callback=self.handle_alert,
+                callbackError=self.handle_error)
+        except Exception as e:
+            logger.warning(f'Unable to start Plex alert listener: {e}')
+            self.listener = None
+            return False
+
+        # Alerts may have been missed while the listener was down
+        self.clear()
+        return self.listening
+
+    def handle_error(self, error: Exception) -> None:
+        """Fall back to expiring snapshots after the alert listener reports an error."""
+        logger.warning(f'Plex alert listener failed, falling back to a {self.ttl} second cache: {error}')
+        self.listener_failed = True
+
+    def handle_alert(self, data: dict) -> None:
+        """Invalidate the snapshots affected by a Plex notification alert.
+
+        Args:
+            data: Notification container received from Plex.
+        """
+        match data.get('type'):
+            case 'timeline':
+                for entry in data.get('TimelineEntry', []):
+                    if entry.get('identifier', 'com.plexapp.plugins.library') == 'com.plexapp.plugins.library':
+                        self.invalidate(
+                            section_id=_to_int(entry.get('sectionID')),
+                            key=_to_int(entry.get('itemID')),
+                            item_type=_to_int(entry.get('type')))
+            case 'activity':
+                for entry in data.get('ActivityNotification', []):
+                    if entry.get('event') != 'ended':
+                        continue
+                    context = (entry.get('Activity') or {}).get('Context') or {}
+                    key = metadata_key_pattern.match(context.get('key') or '')
+                    self.invalidate(
+                        section_id=_to_int(context.get('librarySectionID')),
+                        key=int(key.group(1)) if key else None)
+
+    def invalidate(
+        self,
+        section_id: Optional[int] = None,
+        key: Optional[int] = None,
+        item_type: Optional[int] = None
+    ) -> int:
+        """Drop every snapshot which a change to a Plex item could make stale.
+
+        Args:
+            section_id: ID of the library section the item belongs to, if known.
+            key: ratingKey of the item, if known.
+            item_type: Plex metadata type number of the item, if known.
+
+        Returns:
+            Number of snapshots dropped.
+        """
+        if section_id is None and key is None:
+            return 0
+        with self.lock:
+            self.generation += 1
+            stale = [k for k, n in self.snapshots.items() if n.is_affected(section_id, key, item_type)]
+            for k in stale:
+                del self.snapshots[k]
+            self.invalidated += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop every snapshot."""
+        with self.lock:
+            self.generation += 1
+            self.snapshots.clear()
+
+    """
+    * Snapshots
+    """
+
+    def get(self, library: str, kind: str) -> Optional[Snapshot]:
+        """Returns a snapshot if it is cached and fresh, otherwise None.
+
+        Args:
+            library: Name of the library section.
+            kind: Type of data held by the snapshot, e.g. 'movies'.
+        """
+        listening = self.start_listener()
+        with self.lock:
+            snapshot = self.snapshots.get((library, kind))
+            if snapshot is not None and not listening and self.clock() - snapshot.created > self.ttl:
+                del self.snapshots[(library, kind)]
+                snapshot = None
+            if snapshot is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return snapshot
+
+    def get_or_build(self, library: str, kind: str, build: Callable[[], Snapshot]) -> Snapshot:
+        """Returns a cached snapshot, building and caching a new snapshot if it is missing or stale.
+
+        Args:
+            library: Name of the library section.
+            kind: Type of data held by the snapshot, e.g. 'movies'.
+            build: Builds a new snapshot from Plex.
+        """
+        if (snapshot := self.get(library, kind)) is not None:
+            return snapshot
+        generation = self.generation
+        snapshot = build()
+        snapshot.created = self.clock()
+
+        # Alerts received during the build may not be reflected in it
+        with self.lock:
+            if generation == self.generation:
+                self.snapshots[(library, kind)] = snapshot
+        return snapshot
+
+
+"""
+* Utilities
+"""
+
+
+def _to_int(value: Optional[str | int]) -> Optional[int]:
+    """Returns a value as an integer, or None if it isn't a valid ID."""
+    try:
+        return int(value) if int(value) >= 0 else None
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,374 @@
+"""
+* Incremental Plex Library Sync
+"""
+# Standard Library Imports
+import hashlib
+from collections import defaultdict
+from datetime import datetime, timezone
+from threading import Lock
+from time import perf_counter
+from typing import Iterable, Iterator, Optional
+from xml.etree.ElementTree import Element
+
+# Third Party Imports
+from django.db import transaction
+from django.utils import timezone as django_timezone
+from omnitils.logs import logger
+from plexapi import utils
+from plexapi.library import LibrarySection
+from plexapi.server import PlexServer
+
+# Local Imports
+from managarr.models import Collection, CollectionItem, Episode, Item, Movie, Season, Section, Show, SyncState
+from managarr.sources.plex.core import get_container_size, map_concurrent
+
+# Mirror database, created on first use
+_mirror: Optional['LibraryMirror'] = None
+_mirror_lock = Lock()
+_sync_locks: dict[int, Lock] = defaultdict(Lock)
+
+# Item types synced for each type of library section, each type is synced independently
+section_libtypes: dict[str, tuple[str, ...]] = {
+    'movie': ('movie', 'collection'),
+    'show': ('show', 'season', 'episode', 'collection')
+}
+
+# Model storing each item type
+libtype_models: dict[str, type[Item]] = {
+    'movie': Movie,
+    'show': Show,
+    'season': Season,
+    'episode': Episode,
+    'collection': Collection
+}
+
+# Field referencing the parent of each item type
+parent_fields: dict[str, str] = {
+    'season': 'show',
+    'episode': 'season'
+}
+
+# Fields updated when a changed item is synced again
+item_fields = ('title', 'title_sort', 'index', 'year', 'thumb', 'art', 'added_at', 'updated_at')
+
+# Max items written per query
+BATCH_SIZE = 500
+
+"""
+* Classes
+"""
+
+
+class LibraryMirror:
+    """A local copy of the Plex library items served by the library endpoints, along with the high-water mark
+    of each item type synced for each section, stored in the Django database.
+
+    Note:
+        Writes are made one at a time. Each write reads existing rows before writing, and SQLite fails two
+        transactions doing so at once with 'database is locked' rather than waiting for either of them.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+
+        # Incremented whenever items are written, so data derived from the mirror knows when it is stale
+        self.generation = 0
+
+    def add_section(self, section: LibrarySection) -> None:
+        """Insert or update a library section, so its items can be stored."""
+        with self.lock:
+            Section.objects.update_or_create(id=int(section.key), defaults={
+                'title': section.title,
+                'type': section.type,
+                'updated_at': section.updatedAt.astimezone(timezone.utc) if section.updatedAt else None})
+
+    def get_high_water(self, section_id: int, libtype: str) -> Optional[int]:
+        """Returns the latest updatedAt synced for an item type in a section, or None if it was never synced."""
+        return SyncState.objects.filter(
+            section_id=section_id, libtype=libtype
+        ).values_list('high_water', flat=True).first()
+
+    def get_keys(self, section_id: int, libtype: str) -> set[int]:
+        """Returns the ratingKeys of every item of a type stored for a section."""
+        return set(libtype_models[libtype].objects.filter(section_id=section_id).values_list('pk', flat=True))
+
+    def get_items(self, section_id: int, libtype: str) -> list[dict]:
+        """Returns every item of a type stored for a section, in title sort order."""
+        return [
+            _to_item(row, libtype) for row in
+            libtype_models[libtype].objects.filter(section_id=section_id).order_by('title_sort').values()]
+
+    def get_children(self, section_id: int, libtype: str) -> dict[int, list[dict]]:
+        """Returns every item of a type stored for a section, grouped by parent ratingKey and sorted by index."""
+        children: dict[int, list[dict]] = defaultdict(list)
+        for item in self.get_items(section_id, libtype):
+            children[item['parentRatingKey']].append(item)
+        for items in children.values():
+            items.sort(key=lambda n: n['index'] if n['index'] is not None else -1)
+        return children
+
+    def get_collection_items(self, section_id: int) -> dict[int, list[dict]]:
+        """Returns the items in each collection stored for a section, grouped by collection ratingKey."""
+        members = CollectionItem.objects.filter(collection__section_id=section_id)
+        items: dict[int, dict] = {}
+        for libtype in ('movie', 'show'):
+            items.update({
+                row['rating_key']: _to_item(row, libtype) for row in libtype_models[libtype].objects.filter(
+                    section_id=section_id, pk__in=members.values('rating_key')).values()})
+        collections: dict[int, list[dict]] = defaultdict(list)
+        for collection_key, key in members.order_by('collection', 'position').values_list('collection', 'rating_key'):
+            if key in items:
+                collections[collection_key].append(items[key])
+        return collections
+
+    def merge(
+        self,
+        section_id: int,
+        libtype: str,
+        items: list[Element],
+        high_water: int,
+        members: Optional[dict[int, list[int]]] = None
+    ) -> None:
+        """Insert or update changed items in batches, then record the new high-water mark.
+
+        Args:
+            section_id: ID of the library section.
+            libtype: Type of the items.
+            items: Changed items returned by Plex.
+            high_water: Latest updatedAt of any item of this type in the section.
+            members: ratingKeys of the items in each changed collection.
+        """
+        model, parent = libtype_models[libtype], parent_fields.get(libtype)
+        objs = [model(
+            rating_key=int(n.attrib['ratingKey']),
+            section_id=section_id,
+            title=n.attrib.get('title') or '',
+            title_sort=(n.attrib.get('titleSort') or n.attrib.get('title') or '').lower(),
+            index=utils.cast(int, n.attrib.get('index')),
+            year=utils.cast(int, n.attrib.get('year')),
+            thumb=n.attrib.get('thumb'),
+            art=n.attrib.get('art'),
+            added_at=_to_datetime(n.attrib.get('addedAt')),
+            updated_at=_to_datetime(n.attrib.get('updatedAt')),
+            **({f'{parent}_id': utils.cast(int, n.attrib.get('parentRatingKey'))} if parent else {})
+        ) for n in items]
+        with self.lock, transaction.atomic():
+            existing = set()
+            for keys in _chunks([n.pk for n in objs]):
+                existing.update(model.objects.filter(pk__in=keys).values_list('pk', flat=True))
+            model.objects.bulk_create([n for n in objs if n.pk not in existing], batch_size=BATCH_SIZE)
+            model.objects.bulk_update(
+                [n for n in objs if n.pk in existing],
+                fields=['section', *item_fields, *([parent] if parent else [])],
+                batch_size=BATCH_SIZE)
+            if members:
+                for keys in _chunks(list(members)):
+                    CollectionItem.objects.filter(collection_id__in=keys).delete()
+                CollectionItem.objects.bulk_create([
+                    CollectionItem(collection_id=collection_key, position=i, rating_key=k)
+                    for collection_key, keys in members.items() for i, k in enumerate(keys)
+                ], batch_size=BATCH_SIZE)
+            SyncState.objects.update_or_create(
+                section_id=section_id, libtype=libtype,
+                defaults={'high_water': high_water, 'synced': django_timezone.now()})
+            if objs or members:
+                self.generation += 1
+
+    def delete(self, keys: set[int]) -> None:
+        """Remove items, along with any collection membership they have."""
+        with self.lock, transaction.atomic():
+            for chunk in _chunks(list(keys)):
+                for model in libtype_models.values():
+                    model.objects.filter(pk__in=chunk).delete()
+                CollectionItem.objects.filter(rating_key__in=chunk).delete()
+            if keys:
+                self.generation += 1
+
+    def clear(self, section_id: int) -> None:
+        """Remove a section along with every item and high-water mark stored for it, forcing a full sync."""
+        with self.lock:
+            Section.objects.filter(id=section_id).delete()
+            self.generation += 1
+
+
+"""
+* Mirror
+"""
+
+
+def get_mirror() -> LibraryMirror:
+    """Returns the local library mirror."""
+    global _mirror
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = LibraryMirror()
+        return _mirror
+
+
+"""
+* Plex Queries
+"""
+
+
+def get_section_query(section: LibrarySection, libtype: str, updated_after: Optional[int] = None) -> str:
+    """Returns the Plex API key listing every item of a type in a section, optionally only those updated after
+    a given time."""
+    key = f'/library/sections/{section.key}/all?type={utils.searchType(libtype)}&includeGuids=0'
+    return key if updated_after is None else f'{key}&updatedAt>>={updated_after}'
+
+
+def get_total_size(server: PlexServer, key: str) -> int:
+    """Returns the number of items listed by a Plex API key, without fetching the items themselves."""
+    data = server.query(key, headers={'X-Plex-Container-Start': '0', 'X-Plex-Container-Size': '0'})
+    return utils.cast(int, data.attrib.get('totalSize') or data.attrib.get('size')) or 0
+
+
+def get_libtype_fingerprint(server: PlexServer, section: LibrarySection, libtype: str) -> tuple[int, int]:
+    """Returns the number of items of a type in a section and the latest updatedAt of any of them, fetching only
+    the most recently updated item."""
+    data = server.query(
+        f'{get_section_query(section, libtype)}&sort=updatedAt:desc',
+        headers={'X-Plex-Container-Start': '0', 'X-Plex-Container-Size': '1'})
+    latest = next((n.attrib.get('updatedAt') for n in data if 'ratingKey' in n.attrib), None)
+    return (
+        utils.cast(int, data.attrib.get('totalSize') or data.attrib.get('size')) or 0,
+        utils.cast(int, latest) or 0)
+
+
+def get_fingerprint(section: LibrarySection, libtypes: Optional[Iterable[str]] = None) -> str:
+    """Returns a fingerprint of the items in a section, which changes whenever an item is added, updated, or
+    removed, without fetching the items themselves.
+
+    Args:
+        section: Plex library section.
+        libtypes: Item types to include, includes every item type served for the section if not provided.
+
+    Returns:
+        Hex digest of the number of items of each type and the latest updatedAt of each type.
+    """
+    libtypes = [
+        n for n in section_libtypes.get(section.type, ())
+        if libtypes is None or n in libtypes]
+    results = map_concurrent(lambda n: get_libtype_fingerprint(section._server, section, n), libtypes)
+    data = ';'.join(f'{n}:{size}:{updated}' for n, (size, updated) in zip(libtypes, results))
+    return hashlib.sha1(f'{section.key}|{data}'.encode()).hexdigest()
+
+
+def iter_elements(server: PlexServer, key: str) -> Iterator[Element]:
+    """Yield the raw XML element of every item listed by a Plex API key, one page at a time."""
+    start, size = 0, get_container_size()
+    while True:
+        data = server.query(key, headers={
+            'X-Plex-Container-Start': str(start),
+            'X-Plex-Container-Size': str(size)})
+        page = [n for n in data if 'ratingKey' in n.attrib]
+        yield from page
+        start += size
+        if len(page) < size or start >= (utils.cast(int, data.attrib.get('totalSize')) or 0):
+            break
+
+
+"""
+* Sync
+"""
+
+
+def sync_libtype(section: LibrarySection, libtype: str, mirror: LibraryMirror) -> dict[str, int]:
+    """Sync the items of a single type in a section into the mirror.
+
+    Only items updated since the last sync are fetched. Deleted items are detected by comparing the number of
+    items Plex reports against the mirror, and only when those differ is the full set of ratingKeys compared.
+
+    Args:
+        section: Plex library section.
+        libtype: Type of item to sync.
+        mirror: Local library mirror.
+
+    Returns:
+        Number of items updated and deleted.
+    """
+    server, section_id = section._server, int(section.key)
+    high_water = mirror.get_high_water(section_id, libtype)
+
+    # Fetch items changed since the last sync, an item updated in the same second is fetched again
+    updated = list(iter_elements(server, get_section_query(
+        section, libtype, updated_after=None if high_water is None else high_water - 1)))
+    high_water = max(
+        [high_water or 0, *(utils.cast(int, n.attrib.get('updatedAt')) or 0 for n in updated)])
+
+    # Fetch the members of changed collections
+    members = None
+    if libtype == 'collection':
+        keys = [int(n.attrib['ratingKey']) for n in updated]
+        members = dict(zip(keys, map_concurrent(lambda k: [
+            int(m.attrib['ratingKey'])
+            for m in iter_elements(server, f'/library/collections/{k}/children')], keys)))
+    mirror.merge(section_id, libtype, updated, high_water, members)
+
+    # Compare ratingKeys only if the number of items differs
+    deleted = set()
+    keys = mirror.get_keys(section_id, libtype)
+    if len(keys) != get_total_size(server, get_section_query(section, libtype)):
+        deleted = keys - {
+            int(n.attrib['ratingKey']) for n in iter_elements(server, get_section_query(section, libtype))}
+        mirror.delete(deleted)
+    return {'updated': len(updated), 'deleted': len(deleted)}
+
+
+def sync_section(
+    section: LibrarySection,
+    mirror: Optional[LibraryMirror] = None,
+    libtypes: Optional[Iterable[str]] = None
+) -> dict[str, dict[str, int]]:
+    """Sync every item type served by the library endpoints for a section into the mirror, fetching each item
+    type at once.
+
+    Args:
+        section: Plex library section.
+        mirror: Local library mirror, uses the default mirror if not provided.
+        libtypes: Item types to sync, syncs every item type served for the section if not provided.
+
+    Returns:
+        Number of items updated and deleted for each item type.
+    """
+    mirror = mirror or get_mirror()
+    mirror.add_section(section)
+    with _mirror_lock:
+        lock = _sync_locks[int(section.key)]
+    with lock:
+        s = perf_counter()
+        libtypes = [
+            n for n in section_libtypes.get(section.type, ())
+            if libtypes is None or n in libtypes]
+        results = dict(zip(libtypes, map_concurrent(lambda n: sync_libtype(section, n, mirror), libtypes)))
+    logger.debug(f'Synced {section.title} in {perf_counter() - s:.3f} seconds: {results}')
+    return results
+
+
+"""
+* Utilities
+"""
+
+
+def _to_item(row: dict, libtype: str) -> dict:
+    """Returns a stored item as a dictionary of its Plex attributes."""
+    return {
+        'ratingKey': row['rating_key'],
+        'parentRatingKey': row.get(f'{parent_fields[libtype]}_id') if libtype in parent_fields else None,
+        'title': row['title'],
+        'titleSort': row['title_sort'],
+        'index': row['index'],
+        'thumb': row['thumb'],
+        'art': row['art']
+    }
+
+
+def _to_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Returns a Plex timestamp as a timezone aware datetime, or None if it isn't provided."""
+    return datetime.fromtimestamp(int(value), tz=timezone.utc) if value else None
+
+
+def _chunks(items: list, size: int = BATCH_SIZE) -> Iterator[list]:
+    """Yield a list in chunks, keeping the number of parameters in each query within database limits."""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
@@ -2,30 +2,196 @@
 * Collect Data from TMDB API
 """
 # Standard Library Imports
+import gzip
+import json
 from contextlib import suppress
+from datetime import date, datetime, timedelta, timezone
 from json import JSONDecodeError
-from typing import Optional, Callable
+from pathlib import Path
+from threading import Lock
+from typing import Iterator, Optional, Callable
 
 # Third Party Imports
-import requests
 import yarl
 from omnitils.fetch import request_header_default
 from omnitils.logs import logger
 
+# Local Imports
+from managarr import settings
+from managarr.utils import fetch
+from managarr.utils.cache import TMDBCache, normalize_title
+from managarr.utils.index import TitleIndex
+
+# Lookup cache, created on first use
+_cache: Optional[TMDBCache] = None
+_cache_lock = Lock()
+
+# Offline ID indexes, opened on first use
+_indexes: dict[str, Optional[TitleIndex]] = {}
+_index_lock = Lock()
+
+# Daily export file prefix and title field for each indexed media type
+export_types: dict[str, tuple[str, str]] = {
+    'movie': ('movie_ids', 'original_title'),
+    'tv': ('tv_series_ids', 'original_name'),
+    'collection': ('collection_ids', 'name')
+}
+
+"""
+* Lookup Cache
+"""
+
+
+def get_cache() -> Optional[TMDBCache]:
+    """Returns the persistent TMDB lookup cache, or None if caching is disabled."""
+    global _cache
+    config = settings.ENV.get('TMDB_CACHE', {})
+    if not config.get('ENABLED', True):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = TMDBCache(
+                path=settings.BASE_DIR / 'cache' / 'tmdb.sqlite3',
+                ttl=config.get('TTL', 2592000),
+                ttl_negative=config.get('TTL_NEGATIVE', 86400))
+        return _cache
+
+
+"""
+* Offline ID Index
+"""
+
+
+def get_index_path(media_type: str) -> Path:
+    """Returns the path of the offline ID index for a media type."""
+    return settings.BASE_DIR / 'cache' / 'tmdb_index' / f'{media_type}.idx'
+
+
+def get_index(media_type: str) -> Optional[TitleIndex]:
+    """Returns the offline ID index for a media type, or None if it hasn't been built or is disabled."""
+    if not settings.ENV.get('TMDB_INDEX', {}).get('ENABLED', True):
+        return None
+    with _index_lock:
+        if media_type not in _indexes:
+            path, _indexes[media_type] = get_index_path(media_type), None
+            if path.is_file():
+                try:
+                    _indexes[media_type] = TitleIndex(path)
+                except (OSError, ValueError) as e:
+                    logger.warning(f'Unable to open TMDB index: {e}')
+        return _indexes[media_type]
+
+
+def get_index_id(media_type: str, title: str) -> Optional[int]:
+    """Returns the TMDB ID of a title from the offline index, if it matches exactly one entry.
+
+    Note:
+        The daily exports carry no release dates, so the index can't tell apart entries sharing a title from
+        different years. Lookups with a known year search TMDB instead.
+    """
+    if index := get_index(media_type):
+        if (match := index.get(get_match_key(title))) and match[1] == 1:
+            return match[0]
+    return None
+
+
+def get_export_url(media_type: str, export_date: date) -> yarl.URL:
+    """Returns the URL of a TMDB daily ID export file."""
+    prefix, _ = export_types[media_type]
+    return yarl.URL(f'http://files.tmdb.org/p/exports/{prefix}_{export_date:%m_%d_%Y}.json.gz')
+
+
+def iter_export(
+    media_type: str,
+    export_date: Optional[date] = None,
+    path: Optional[Path] = None
+) -> Iterator[tuple[str, int, float]]:
+    """Yield the entries of a TMDB daily ID export file, streamed from TMDB or read from a local copy.
+
+    Args:
+        media_type: Type of media to export, one of 'movie', 'tv', or 'collection'.
+        export_date: Date of the export to download, defaults to yesterday (UTC) which is always available.
+        path: Path to a previously downloaded export file, used instead of downloading.
+
+    Yields:
+        Normalized title key, TMDB ID, and popularity of each entry. Adult entries are skipped.
+    """
+    _, field = export_types[media_type]
+
+    def _entries(lines: Iterator[str]) -> Iterator[tuple[str, int, float]]:
+        """Parse each line of an export file."""
+        for line in lines:
+            with suppress(ValueError, KeyError, TypeError):
+                n = json.loads(line)
+                if not n.get('adult'):
+                    yield get_match_key(n[field]), int(n['id']), float(n.get('popularity') or 0)
+
+    # Read a local file
+    if path is not None:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            yield from _entries(f)
+        return
+
+    # Stream from TMDB
+    export_date = export_date or (datetime.now(timezone.utc) - timedelta(days=1)).date()
+    with fetch.get(get_export_url(media_type, export_date), stream=True) as r:
+        r.raise_for_status()
+        with gzip.open(r.raw, 'rt', encoding='utf-8') as f:
+            yield from _entries(f)
+
+
+def build_index(
+    media_type: str,
+    export_date: Optional[date] = None,
+    path: Optional[Path] = None
+) -> int:
+    """Build the offline ID index for a media type from a TMDB daily ID export file.
+
+    Args:
+        media_type: Type of media to index, one of 'movie', 'tv', or 'collection'.
+        export_date: Date of the export to download, defaults to yesterday (UTC).
+        path: Path to a previously downloaded export file, used instead of downloading.
+
+    Returns:
+        Number of unique titles indexed.
+    """
+    count = TitleIndex.build(
+        path=get_index_path(media_type),
+        entries=iter_export(media_type, export_date=export_date, path=path))
+
+    # Reopen on next use
+    with _index_lock:
+        if index := _indexes.pop(media_type, None):
+            index.close()
+    return count
+
+
 """
 * TMDB API
 """
 
 
-def get_search(
+def sort_results(
+    results: list[dict],
+    sort_with: Optional[Callable] = None,
+    sort_reverse: bool = False
+) -> list[dict]:
+    """Return a list of TMDB results sorted using a provided expression, unsorted if sorting fails."""
+    if sort_with is not None:
+        with suppress(Exception):
+            return sorted(results, key=sort_with, reverse=sort_reverse)
+        # Sorting failed
+        logger.warning('Couldn\'t sort results using the provided expression! Returning unsorted results.')
+    return results
+
+
+def get_results(
     token: str,
     url: yarl.URL | str,
-    query: dict,
-    sort_with: Callable = lambda k: k['release_date'][:4],
-    sort_reverse: bool = False,
-    header: Optional[dict] = None
-) -> list[dict]:
-    """Return a list from an TMDB API search query."""
+    header: Optional[dict] = None,
+    key: str = 'results'
+) -> Optional[list[dict]]:
+    """Return the unsorted results of a TMDB API search query, or None if the response couldn't be parsed."""
 
     # Format the request headers
     header = header or request_header_default.copy()
@@ -35,30 +201,72 @@ def get_search(
     })
 
     # Request the data
-    with requests.get(url, headers=header) as r:
+    with fetch.get(url, headers=header) as r:
         r.raise_for_status()
 
         # Parse the results
         try:
-            results = r.json()['results']
+            return r.json()[key]
         except (JSONDecodeError, KeyError):
             logger.error('Failed to parse JSON response!')
-            return []
+            return None
 
-        # Check for no results returned
-        if not results:
+
+def get_search(
+    token: str,
+    url: yarl.URL | str,
+    query: dict,
+    sort_with: Callable = lambda k: k['release_date'][:4],
+    sort_reverse: bool = False,
+    header: Optional[dict] = None
+) -> list[dict]:
+    """Return a list from an TMDB API search query."""
+    results = get_results(token=token, url=url, header=header)
+
+    # Check for no results returned
+    if not results:
+        if results is not None:
             logger.warning(f'No results were found matching provided query:\n{query}')
-            return []
+        return []
 
-        # Sort and return the results
-        if sort_with is not None:
-            with suppress(Exception):
-                sorted_results = sorted(results, key=sort_with, reverse=sort_reverse)
-                return sorted_results
-            # Sorting failed
-            logger.warning('Couldn\'t sort results using the provided expression! Returning unsorted results.')
-            return results
-        return results
+    # Sort and return the results
+    return sort_results(results, sort_with, sort_reverse)
+
+
+def get_cached_search(
+    endpoint: str,
+    media_type: str,
+    query: dict,
+    token: str,
+    year: Optional[str | int] = None,
+    header: Optional[dict] = None
+) -> Optional[list[dict]]:
+    """Return the unsorted results of a TMDB API search query, checking the lookup cache first.
+
+    Args:
+        endpoint: Search endpoint, e.g. 'movie' or 'collection'.
+        media_type: Type of media cached for this search.
+        query: Search query parameters.
+        token: TMDB API token.
+        year: Release year included in the query, if any.
+        header: Request headers to use.
+
+    Returns:
+        List of results, or None if the response couldn't be parsed.
+    """
+    title = query.get('query', '')
+
+    # Check the lookup cache
+    cache = get_cache()
+    results = cache.get(title, year, media_type) if cache else None
+
+    # Request the data
+    if results is None:
+        url = yarl.URL(f"https://api.themoviedb.org/3/search/{endpoint}").with_query(query)
+        results = get_results(token=token, url=url, header=header)
+        if results is not None and cache:
+            cache.set(title, year, media_type, results)
+    return results
 
 
 def get_search_movie(
@@ -69,20 +277,97 @@ def get_search_movie(
         header: Optional[dict] = None
 ) -> list[dict]:
     """Return a list of movies matching a provided name from an TMDB API search query."""
+    results = get_cached_search(
+        endpoint='movie',
+        media_type='movie',
+        query=query,
+        token=token,
+        year=query.get('primary_release_year', query.get('year')),
+        header=header)
+
+    # Check for no results returned
+    if not results:
+        if results is not None:
+            logger.warning(f'No results were found matching provided query:\n{query}')
+        return []
+
+    # Sort and return the results
+    return sort_results(results, sort_with, sort_reverse)
+
 
-    # Define the query URL
-    url = yarl.URL("https://api.themoviedb.org/3/search/movie").with_query(query)
-    return get_search(
+def get_search_collection(
+        query: dict,
+        token: str,
+        header: Optional[dict] = None
+) -> list[dict]:
+    """Return a list of collections matching a provided name from an TMDB API search query."""
+    results = get_cached_search(
+        endpoint='collection',
+        media_type='collection',
+        query=query,
         token=token,
-        url=url,
+        header=header)
+
+    # Check for no results returned
+    if not results:
+        if results is not None:
+            logger.warning(f'No results were found matching provided query:\n{query}')
+        return []
+    return results
+
+
+def get_search_tv(
+        query: dict,
+        token: str,
+        sort_with: Callable = lambda k: k['first_air_date'][:4],
+        sort_reverse: bool = False,
+        header: Optional[dict] = None
+) -> list[dict]:
+    """Return a list of tv shows matching a provided name from an TMDB API search query."""
+    results = get_cached_search(
+        endpoint='tv',
+        media_type='tv',
         query=query,
-        sort_with=sort_with,
-        sort_reverse=sort_reverse,
+        token=token,
+        year=query.get('first_air_date_year'),
         header=header)
 
+    # Check for no results returned
+    if not results:
+        if results is not None:
+            logger.warning(f'No results were found matching provided query:\n{query}')
+        return []
+
+    # Sort and return the results
+    return sort_results(results, sort_with, sort_reverse)
+
+
+def get_collection_parts(token: str, collection_id: int, header: Optional[dict] = None) -> list[dict]:
+    """Return the movies which are part of a TMDB collection."""
+
+    # Check the lookup cache
+    cache = get_cache()
+    parts = cache.get(str(collection_id), None, 'collection-parts') if cache else None
+
+    # Request the data
+    if parts is None:
+        url = yarl.URL(f"https://api.themoviedb.org/3/collection/{collection_id}")
+        parts = get_results(token=token, url=url, header=header, key='parts')
+        if parts is None:
+            return []
+        if cache:
+            cache.set(str(collection_id), None, 'collection-parts', parts)
+    return parts
+
 
 def get_movie_id(token: str, name: str, year: Optional[str | int] = None) -> int:
-    """Get the TMDB ID of a given movie."""
+    """Get the TMDB ID of a given movie, checking the offline index before searching TMDB.
+
+    Note:
+        The offline index has no release years, so a movie with a known year never uses it.
+    """
+    if year is None and (id_tmdb := get_index_id('movie', name)) is not None:
+        return id_tmdb
 
     # Define the query
     query = {'query': name}
@@ -100,3 +385,92 @@ def get_movie_id(token: str, name: str, year: Optional[str | int] = None) -> int
     if not items:
         return logger.error('No matching movie was returned by TMDB!')
     return int(items[0]['id'])
+
+
+def get_tv_id(token: str, name: str, year: Optional[str | int] = None) -> Optional[int]:
+    """Get the TMDB ID of a given tv show, checking the offline index before searching TMDB.
+
+    Note:
+        The offline index has no first air years, so a show with a known year never uses it.
+    """
+    if year is None and (id_tmdb := get_index_id('tv', name)) is not None:
+        return id_tmdb
+
+    # Define the query
+    query = {'query': name}
+    if year is not None:
+        query['first_air_date_year'] = str(year)
+
+    # Request tv show results
+    items: list[dict] = get_search_tv(
+        query=query,
+        token=token,
+        sort_with=lambda k: k['popularity'],
+        sort_reverse=True)
+
+    # Check for an empty return
+    if not items:
+        return logger.error('No matching tv show was returned by TMDB!')
+    return int(items[0]['id'])
+
+
+def get_collection_id(token: str, name: str) -> Optional[int]:
+    """Get the TMDB ID of a given movie collection, preferring an exact name match over the top result."""
+    if (id_tmdb := get_index_id('collection', name)) is not None:
+        return id_tmdb
+    items = get_search_collection(query={'query': name}, token=token)
+    if not items:
+        return logger.error('No matching collection was returned by TMDB!')
+    key = get_match_key(name)
+    for n in items:
+        if get_match_key(n.get('name', '')) == key:
+            return int(n['id'])
+    return int(items[0]['id'])
+
+
+"""
+* Matching
+"""
+
+
+def get_match_key(title: str) -> str:
+    """Returns a title reduced to its casefolded letters and digits, for loosely comparing titles."""
+    return ''.join(c for c in normalize_title(title) if c.isalnum())
+
+
+def match_collection_parts(
+    parts: list[dict],
+    titles: list[tuple[str, Optional[int]]]
+) -> list[Optional[int]]:
+    """Match movie titles to the parts of a TMDB collection.
+
+    Args:
+        parts: Movies returned for a TMDB collection.
+        titles: Title and release year (if known) of each movie to match.
+
+    Returns:
+        The TMDB ID matched to each title, or None if the title matched no part (or more than one part).
+    """
+    by_title_year: dict[tuple[str, Optional[int]], int] = {}
+    by_title: dict[str, list[int]] = {}
+    for n in parts:
+        with suppress(KeyError, TypeError, ValueError):
+            year = int(n['release_date'][:4]) if n.get('release_date') else None
+            for name in {n.get('title') or '', n.get('original_title') or ''}:
+                if key := get_match_key(name):
+                    by_title_year.setdefault((key, year), int(n['id']))
+                    by_title.setdefault(key, [])
+                    if int(n['id']) not in by_title[key]:
+                        by_title[key].append(int(n['id']))
+
+    # Prefer an exact title and year match, then a title that only matches one part
+    matches = []
+    for title, year in titles:
+        key = get_match_key(title)
+        if (key, year) in by_title_year:
+            matches.append(by_title_year[(key, year)])
+        elif len(by_title.get(key, [])) == 1:
+            matches.append(by_title[key][0])
+        else:
+            matches.append(None)
+    return matches
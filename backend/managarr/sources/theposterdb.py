@@ -2,18 +2,22 @@
 * Collect Data from ThePosterDB.com
 """
 # Standard Library Imports
+import re
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
+from functools import partial
 from typing import Optional
 
 import yarl
 # Third Party Imports
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 from omnitils.logs import logger
 from omnitils.schema import Schema
 
 # Local Imports
 from managarr.utils._schema import Movie, MovieCollection, TVShow, TVSeason, TVEpisode, MediaSources, MediaTypes
-from managarr.sources.themoviedb import get_movie_id
+from managarr.sources.themoviedb import (
+    get_movie_id, get_tv_id, get_collection_id, get_collection_parts, match_collection_parts)
 
 """
 * Schemas
@@ -54,7 +58,7 @@ def get_tv_show(tmdb_token: str, show: BasePoster, seasons: list[TVSeason] = Non
         seasons=seasons,
         year=year,
         source=show.source,
-        id_tmdb=get_movie_id(tmdb_token, title) if show.id_tmdb is None else show.id_tmdb
+        id_tmdb=get_tv_id(tmdb_token, title, year) if show.id_tmdb is None else show.id_tmdb
     )
 
 
@@ -86,23 +90,38 @@ def get_tv_episode(episode: BasePoster) -> TVEpisode:
     )
 
 
-def get_movie(tmdb_token: str, movie: BasePoster) -> Movie:
-    """Format movie data."""
+def parse_movie_title(title: str) -> tuple[str, Optional[int]]:
+    """Split a movie poster title into the movie title and release year.
 
-    # Get title and year
-    title_split = movie.title.split(" (")
-    title = f'{title_split[0]} ({title_split[1]}' if len(title_split[1]) != 5 else title_split[0]
+    Args:
+        title: Poster title, e.g. 'The Matrix (1999)'.
+
+    Returns:
+        Tuple containing the movie title and release year (if found).
+    """
+    title_split = title.split(" (")
+    if len(title_split) < 2:
+        return title.strip(), None
+    name = f'{title_split[0]} ({title_split[1]}' if len(title_split[1]) != 5 else title_split[0]
     try:
         year = int(title_split[-1].split(")")[0])
-    except IndexError:
+    except (IndexError, ValueError):
         year = None
+    return name, year
+
+
+def get_movie(tmdb_token: str, movie: BasePoster, id_tmdb: Optional[int] = None) -> Movie:
+    """Format movie data, looking up the TMDB ID if one isn't provided."""
+
+    # Get title and year
+    title, year = parse_movie_title(movie.title)
 
     # Return data
     return Movie(
         title=title,
         url_poster=movie.url_poster,
         year=year,
-        id_tmdb=get_movie_id(tmdb_token, title, year),
+        id_tmdb=get_movie_id(tmdb_token, title, year) if id_tmdb is None else id_tmdb,
         source=movie.source)
 
 
@@ -126,21 +145,23 @@ def get_movie_collection(collection: BasePoster, movies: list[Movie] = None) ->
 
 
 class PosterDBPage:
+    parse_only = SoupStrainer('div', class_='row d-flex flex-wrap m-0 w-100 mx-n1 mt-n1')
     media_map: dict[str, MediaTypes] = {
         'Movie': MediaTypes.Movie,
         'Collection': MediaTypes.MovieCollection,
         'Show': MediaTypes.TVShow,
     }
 
-    def __init__(self, tmdb_token: str, soup: BeautifulSoup):
+    def __init__(self, tmdb_token: str, soup: BeautifulSoup, max_workers: int = 8):
         self.soup = soup
         self.tmdb_token = tmdb_token
+        self.max_workers = max(1, max_workers)
         self.main_set: Optional[BasePoster] = None
         self.posters = self.get_posters()
 
     def get_poster_tags(self) -> list[Tag]:
         """Returns a list of HTML tags containing poster data, extracted from the main tag."""
-        main_tag = self.soup.find('div', class_='row d-flex flex-wrap m-0 w-100 mx-n1 mt-n1')
+        main_tag = self.soup.find(self.parse_only)
         return main_tag.find_all('div', class_='col-6 col-lg-2 p-1')
 
     def get_posters(self) -> list[BasePoster]:
@@ -182,11 +203,35 @@ class PosterDBPage:
 
         return posters
 
+    def get_collection_ids(self, posters: list[BasePoster]) -> list[Optional[int]]:
+        """Returns the TMDB ID of each movie poster that matches a part of this set's TMDB collection.
+
+        Args:
+            posters: Movie posters to match.
+
+        Returns:
+            The TMDB ID matched to each poster, or None if it couldn't be matched.
+        """
+        if self.main_set is None or self.main_set.media_type != MediaTypes.MovieCollection:
+            return [None] * len(posters)
+        collection_id = get_collection_id(self.tmdb_token, self.main_set.title)
+        if collection_id is None:
+            return [None] * len(posters)
+        return match_collection_parts(
+            parts=get_collection_parts(self.tmdb_token, collection_id),
+            titles=[parse_movie_title(n.title) for n in posters])
+
     def get_movies(self) -> list[Movie]:
         """Returns a list of Movie objects formatted from BasePoster objects."""
-        movie_list: list[Movie] = [
-            get_movie(self.tmdb_token, n) for n in self.posters
-            if n.media_type == MediaTypes.Movie]
+        posters = [n for n in self.posters if n.media_type == MediaTypes.Movie]
+        if not posters:
+            return []
+
+        # Match posters against the collection, then search for the rest concurrently in poster order
+        ids = self.get_collection_ids(posters)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(posters))) as executor:
+            movie_list: list[Movie] = list(executor.map(
+                partial(get_movie, self.tmdb_token), posters, ids))
         with suppress(KeyError, TypeError, ValueError):
             movie_list = sorted(movie_list, key=lambda x: x.year)
         return movie_list
@@ -212,6 +257,16 @@ class PosterDBPage:
 * Utilities
 """
 
+# Poster page elements needed to find the parent set
+poster_parse_only = SoupStrainer('a', class_='rounded view_all')
+
+# User page elements needed to find sets and pagination
+user_parse_only = SoupStrainer('a', href=True)
+
+# Set and pagination links
+set_pattern = re.compile(r'/set/\d+')
+page_pattern = re.compile(r'[?&]page=(\d+)')
+
 
 def get_set_from_poster(soup) -> Optional[yarl.URL]:
     """Extract collection URL from page.
@@ -223,6 +278,37 @@ def get_set_from_poster(soup) -> Optional[yarl.URL]:
         Collection URL.
     """
     with suppress(Exception):
-        url = soup.find('a', class_='rounded view_all')['href']
+        url = soup.find(poster_parse_only)['href']
         return yarl.URL(url)
     return None
+
+
+def get_user_page_count(soup) -> int:
+    """Extract the number of pages listed in a user page's pagination links.
+
+    Args:
+        soup: BeautifulSoup object of a user page.
+
+    Returns:
+        Number of pages, 1 if the page has no pagination.
+    """
+    pages = [
+        int(m.group(1)) for a in soup.find_all('a', href=True)
+        if (m := page_pattern.search(a['href']))]
+    return max(pages, default=1)
+
+
+def get_sets_from_user_page(soup) -> list[yarl.URL]:
+    """Extract the URL of each set linked from a user page.
+
+    Args:
+        soup: BeautifulSoup object of a user page.
+
+    Returns:
+        List of unique set URLs, in page order.
+    """
+    base = yarl.URL('https://theposterdb.com')
+    urls = [
+        base.join(yarl.URL(m.group())) for a in soup.find_all('a', href=True)
+        if (m := set_pattern.search(a['href']))]
+    return list(dict.fromkeys(urls))
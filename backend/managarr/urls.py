@@ -2,19 +2,34 @@
 * URL configuration for Plex Managarr API
 """
 # Third Party Imports
+import requests
 from django.contrib import admin
 from django.urls import path
 from ninja import NinjaAPI
+from omnitils.logs import logger
 
 # Local Imports
+from managarr.apps import ManagarrConfig
 from managarr.routes.plex import api as route_plex
+from managarr.utils.render import get_renderer
 
 # Add our API endpoints
 APIRouter = NinjaAPI(
     docs_url='docs/',
-    title='Plex Managarr API')
+    title='Plex Managarr API',
+    urls_namespace='api',
+    renderer=get_renderer())
 APIRouter.add_router('/plex/', route_plex)
 
+
+@APIRouter.exception_handler(requests.ConnectionError)
+def plex_unreachable(request, exc: requests.ConnectionError):
+    """Drop the Plex server connection when the server can't be reached, so the next request reconnects."""
+    logger.warning(f'Unable to reach the Plex server, reconnecting on next request: {exc}')
+    ManagarrConfig.PlexAPI.reset()
+    return APIRouter.create_response(request, {"detail": "Unable to reach the Plex server."}, status=502)
+
+
 # URL patterns
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -0,0 +1,279 @@
+"""
+* Caching Utilities
+"""
+# Standard Library Imports
+import json
+import sqlite3
+import time
+import unicodedata
+import zlib
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+"""
+* Utilities
+"""
+
+
+def normalize_title(title: str) -> str:
+    """Normalize a title for use as a lookup key.
+
+    Args:
+        title: Title to normalize.
+
+    Returns:
+        Casefolded title with unicode forms and whitespace collapsed.
+    """
+    return ' '.join(unicodedata.normalize('NFKC', title).casefold().split())
+
+
+"""
+* Classes
+"""
+
+
+class SQLiteCache:
+    """A thread-safe cache persisted to a SQLite database file."""
+    schema: str = ''
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.lock = Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.executescript(self.schema)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self.lock:
+            self.conn.close()
+
+
+class TMDBCache(SQLiteCache):
+    """Caches TMDB search results keyed by normalized title, year, and media type."""
+    schema = """
+        CREATE TABLE IF NOT EXISTS tmdb_search (
+            title TEXT NOT NULL,
+            year TEXT NOT NULL,
+            media_type TEXT NOT NULL,
+            results TEXT NOT NULL,
+            created REAL NOT NULL,
+            PRIMARY KEY (title, year, media_type)
+        );
+    """
+
+    def __init__(self, path: Path, ttl: int = 2592000, ttl_negative: int = 86400):
+        super().__init__(path)
+        self.ttl = ttl
+        self.ttl_negative = ttl_negative
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(title: str, year: Optional[str | int], media_type: str) -> tuple[str, str, str]:
+        """Returns a normalized cache key for a search."""
+        return normalize_title(title), str(year or ''), media_type
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hit and miss counters for this cache."""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def get(self, title: str, year: Optional[str | int], media_type: str) -> Optional[list[dict]]:
+        """Returns cached search results, or None if no unexpired entry exists.
+
+        Args:
+            title: Title that was searched.
+            year: Release year that was searched, if any.
+            media_type: Type of media searched, e.g. 'movie'.
+
+        Returns:
+            List of cached results (empty for a cached "no results" response), or None on a miss.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT results, created FROM tmdb_search WHERE title=? AND year=? AND media_type=?',
+                self.get_key(title, year, media_type)).fetchone()
+            if row is not None:
+                results = json.loads(row[0])
+                if time.time() - row[1] < (self.ttl if results else self.ttl_negative):
+                    self.hits += 1
+                    return results
+            self.misses += 1
+            return None
+
+    def set(self, title: str, year: Optional[str | int], media_type: str, results: list[dict]) -> None:
+        """Store search results, an empty list is cached as a negative result.
+
+        Args:
+            title: Title that was searched.
+            year: Release year that was searched, if any.
+            media_type: Type of media searched, e.g. 'movie'.
+            results: Results returned by the search.
+        """
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO tmdb_search VALUES (?, ?, ?, ?, ?)',
+                (*self.get_key(title, year, media_type), json.dumps(results), time.time()))
+
+    def clear_expired(self) -> None:
+        """Remove expired entries from the cache."""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM tmdb_search WHERE "
+                "(results != '[]' AND created < ?) OR (results = '[]' AND created < ?)",
+                (now - self.ttl, now - self.ttl_negative))
+
+
+class PageCache(SQLiteCache):
+    """Caches page content alongside its ETag and Last-Modified validators, evicting the least recently
+    used pages once the compressed content exceeds a maximum size."""
+    schema = """
+        CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            body BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            accessed REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed);
+    """
+
+    def __init__(self, path: Path, max_size: int = 268435456):
+        super().__init__(path)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        with self.lock:
+            self.size = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hit (not modified) and miss counters for this cache."""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def get_validators(self, url: str) -> dict[str, str]:
+        """Returns conditional request headers for a cached page, empty if the page isn't cached.
+
+        Args:
+            url: URL of the page.
+
+        Returns:
+            Dictionary containing If-None-Match and/or If-Modified-Since headers.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT etag, last_modified FROM pages WHERE url=?', (url,)).fetchone()
+        if row is None:
+            return {}
+        headers = {'If-None-Match': row[0], 'If-Modified-Since': row[1]}
+        return {k: v for k, v in headers.items() if v}
+
+    def get(self, url: str) -> Optional[str]:
+        """Returns the cached content of a page and marks it as recently used, or None if the page isn't cached."""
+        with self.lock, self.conn:
+            row = self.conn.execute('SELECT body FROM pages WHERE url=?', (url,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute('UPDATE pages SET accessed=? WHERE url=?', (time.time(), url))
+            self.hits += 1
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def set(self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Store the content of a page, then evict pages until the cache fits within its maximum size.
+
+        Args:
+            url: URL of the page.
+            body: Page content.
+            etag: ETag header returned with the page.
+            last_modified: Last-Modified header returned with the page.
+        """
+        data = zlib.compress(body.encode('utf-8'))
+        with self.lock, self.conn:
+            self.misses += 1
+            row = self.conn.execute('SELECT size FROM pages WHERE url=?', (url,)).fetchone()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)',
+                (url, etag, last_modified, data, len(data), time.time()))
+            self.size += len(data) - (row[0] if row else 0)
+
+            # Evict least recently used pages
+            if self.size <= self.max_size:
+                return
+            evict = []
+            for _url, size in self.conn.execute('SELECT url, size FROM pages ORDER BY accessed'):
+                if self.size <= self.max_size:
+                    break
+                evict.append((_url,))
+                self.size -= size
+            self.conn.executemany('DELETE FROM pages WHERE url=?', evict)
+
+
+class ImageCache(SQLiteCache):
+    """Caches image content by key, evicting the least recently used images once their total size exceeds a
+    maximum size."""
+    schema = """
+        CREATE TABLE IF NOT EXISTS images (
+            key TEXT PRIMARY KEY,
+            content_type TEXT NOT NULL,
+            body BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            accessed REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS images_accessed ON images (accessed);
+    """
+
+    def __init__(self, path: Path, max_size: int = 1073741824):
+        super().__init__(path)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        with self.lock:
+            self.size = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM images').fetchone()[0]
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hit and miss counters for this cache."""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def get(self, key: str) -> Optional[tuple[bytes, str]]:
+        """Returns the content and content type of a cached image and marks it as recently used, or None if
+        the image isn't cached."""
+        with self.lock, self.conn:
+            row = self.conn.execute('SELECT body, content_type FROM images WHERE key=?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute('UPDATE images SET accessed=? WHERE key=?', (time.time(), key))
+            self.hits += 1
+        return row[0], row[1]
+
+    def set(self, key: str, body: bytes, content_type: str) -> None:
+        """Store an image, then evict images until the cache fits within its maximum size.
+
+        Args:
+            key: Key of the image.
+            body: Image content.
+            content_type: MIME type of the image.
+        """
+        with self.lock, self.conn:
+            row = self.conn.execute('SELECT size FROM images WHERE key=?', (key,)).fetchone()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?)',
+                (key, content_type, body, len(body), time.time()))
+            self.size += len(body) - (row[0] if row else 0)
+
+            # Evict least recently used images
+            if self.size <= self.max_size:
+                return
+            evict = []
+            for _key, size in self.conn.execute('SELECT key, size FROM images ORDER BY accessed'):
+                if self.size <= self.max_size:
+                    break
+                evict.append((_key,))
+                self.size -= size
+            self.conn.executemany('DELETE FROM images WHERE key=?', evict)
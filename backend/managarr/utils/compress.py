@@ -0,0 +1,90 @@
+"""
+* Response Compression
+"""
+# Standard Library Imports
+import gzip
+from typing import Optional
+
+# Third Party Imports
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+# Local Imports
+from managarr import settings
+
+# Use brotli for compression if available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content types worth compressing
+compressible_types = ('application/json', 'application/x-ndjson', 'text/')
+
+"""
+* Compression
+"""
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Returns a response body compressed using a content encoding, e.g. 'br' or 'gzip'."""
+    if encoding == 'br':
+        return brotli.compress(body, quality=4)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def get_encodings() -> tuple[str, ...]:
+    """Returns the supported content encodings, in order of preference."""
+    return ('br', 'gzip') if brotli else ('gzip',)
+
+
+def get_encoding(accept_encoding: str) -> Optional[str]:
+    """Returns the preferred content encoding accepted by a client, or None if none are supported.
+
+    Args:
+        accept_encoding: Accept-Encoding header sent by the client.
+    """
+    accepted = set()
+    for part in accept_encoding.split(','):
+        name, *params = (n.strip() for n in part.split(';'))
+        if any(p.replace(' ', '').lower() in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000') for p in params):
+            continue
+        accepted.add(name.lower())
+    return next((n for n in get_encodings() if n in accepted or '*' in accepted), None)
+
+
+"""
+* Middleware
+"""
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compresses responses larger than a minimum size using brotli (if installed) or gzip.
+
+    Streaming responses, responses that are already encoded, and content types that aren't worth compressing,
+    e.g. images, are sent as is.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = settings.ENV.get('API', {}).get('COMPRESS_MIN_SIZE', 1024)
+
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        if response.streaming or response.has_header('Content-Encoding') or response.status_code != 200:
+            return response
+        if not response.get('Content-Type', '').startswith(compressible_types):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < self.min_size:
+            return response
+        if not (encoding := get_encoding(request.headers.get('Accept-Encoding', ''))):
+            return response
+
+        # The compressed body is no longer byte-for-byte identical to the uncompressed body
+        response.content = compress(response.content, encoding)
+        response['Content-Length'] = str(len(response.content))
+        response['Content-Encoding'] = encoding
+        if (etag := response.get('ETag')) and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        return response
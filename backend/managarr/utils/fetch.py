@@ -0,0 +1,165 @@
+"""
+* HTTP Session Utilities
+"""
+# Standard Library Imports
+from threading import BoundedSemaphore, Lock
+from typing import Optional
+
+# Third Party Imports
+import requests
+import yarl
+from omnitils.fetch import request_header_default
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Local Imports
+from managarr import settings
+from managarr.utils.ratelimit import RateLimiter, parse_retry_after
+
+# Shared session, created on first use
+_session: Optional[requests.Session] = None
+_session_lock = Lock()
+
+# Concurrent request limits by host
+_host_limits: dict[str, BoundedSemaphore] = {}
+
+# Adaptive request rates by host
+_rate_limiters: dict[str, RateLimiter] = {}
+
+# Request counters by host
+_stats: dict[str, dict[str, int]] = {}
+_stats_lock = Lock()
+
+"""
+* Session
+"""
+
+
+def get_config() -> dict:
+    """Returns the HTTP settings defined in the project environment."""
+    return settings.ENV.get('HTTP', {})
+
+
+def get_session() -> requests.Session:
+    """Returns a shared session which pools keep-alive connections per host and retries transient failures.
+
+    Note:
+        Throttled (429) responses aren't retried by the session, they're handled by the host's rate limiter.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            config = get_config()
+            retry = Retry(
+                total=config.get('RETRIES', 3),
+                backoff_factor=config.get('BACKOFF', 0.5),
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=frozenset({'GET', 'HEAD'}),
+                respect_retry_after_header=False,
+                raise_on_status=False)
+            adapter = HTTPAdapter(
+                pool_connections=config.get('POOL_HOSTS', 10),
+                pool_maxsize=config.get('POOL_SIZE', 16),
+                max_retries=retry)
+            _session = requests.Session()
+            _session.headers.update(request_header_default)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+
+def get_host_limit(host: str) -> BoundedSemaphore:
+    """Returns a semaphore limiting the number of concurrent requests made to a host."""
+    with _session_lock:
+        if host not in _host_limits:
+            config = get_config()
+            limit = config.get('HOST_LIMITS', {}).get(host, config.get('HOST_LIMIT', 8))
+            _host_limits[host] = BoundedSemaphore(max(1, limit))
+        return _host_limits[host]
+
+
+def get_rate_limiter(host: str) -> RateLimiter:
+    """Returns the rate limiter shared by all requests made to a host."""
+    with _session_lock:
+        if host not in _rate_limiters:
+            config = get_config()
+            rate = config.get('RATE_LIMITS', {}).get(host, config.get('RATE_LIMIT', 10))
+            _rate_limiters[host] = RateLimiter(max_rate=rate)
+        return _rate_limiters[host]
+
+
+def get(
+    url: str | yarl.URL,
+    headers: Optional[dict] = None,
+    timeout: Optional[float] = None,
+    **kwargs
+) -> requests.Response:
+    """Make a GET request using the shared session.
+
+    Args:
+        url: URL to request.
+        headers: Request headers, merged with the session defaults.
+        timeout: Request timeout in seconds, uses the configured default if not provided.
+
+    Returns:
+        The response object.
+
+    Note:
+        Blocks while the configured number of requests to the same host are already in flight, or while the
+        host's rate limit is exhausted. Throttled (429) requests are retried after the host's Retry-After delay.
+    """
+    url, config = yarl.URL(str(url)), get_config()
+    limiter = get_rate_limiter(url.host)
+    for attempt in range(config.get('THROTTLE_RETRIES', 5) + 1):
+        limiter.acquire()
+        with get_host_limit(url.host):
+            r = get_session().get(
+                str(url),
+                headers=headers,
+                timeout=timeout or config.get('TIMEOUT', 30),
+                **kwargs)
+
+        # Back off if throttled
+        if r.status_code == 429:
+            limiter.throttled(parse_retry_after(r.headers.get('Retry-After')))
+            if attempt < config.get('THROTTLE_RETRIES', 5):
+                r.close()
+                continue
+        else:
+            limiter.succeeded()
+        break
+
+    # Streamed responses are counted by their reported length
+    size = int(r.headers.get('Content-Length') or 0) if kwargs.get('stream') else len(r.content)
+    with _stats_lock:
+        n = _stats.setdefault(url.host, {'requests': 0, 'bytes': 0})
+        n['requests'] += 1
+        n['bytes'] += size
+    return r
+
+
+"""
+* Stats
+"""
+
+
+def get_stats() -> dict[str, dict[str, int]]:
+    """Returns the number of requests, bytes received, and connections opened for each host."""
+    with _stats_lock:
+        stats = {host: {**n, 'connections': 0} for host, n in _stats.items()}
+    if _session is None:
+        return stats
+
+    # Connections opened by each host's pool, requests above this number reused a connection
+    for adapter in set(_session.adapters.values()):
+        for key in list(adapter.poolmanager.pools.keys()):
+            if pool := adapter.poolmanager.pools.get(key):
+                n = stats.setdefault(pool.host, {'requests': 0, 'bytes': 0, 'connections': 0})
+                n['connections'] += pool.num_connections
+    return stats
+
+
+def get_rates() -> dict[str, float]:
+    """Returns the current request rate allowed for each host, in requests per second."""
+    with _session_lock:
+        return {host: limiter.rate for host, limiter in _rate_limiters.items()}
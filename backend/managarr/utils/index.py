@@ -0,0 +1,108 @@
+"""
+* Title Index Utilities
+"""
+# Standard Library Imports
+import hashlib
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Iterable, Optional
+
+"""
+* Utilities
+"""
+
+
+def hash_key(key: str) -> int:
+    """Returns a stable 64-bit hash of a lookup key."""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+"""
+* Classes
+"""
+
+
+class TitleIndex:
+    """A read-only lookup of title keys to IDs, memory-mapped from a file of fixed-size records sorted by key hash.
+
+    Each record holds a key hash, the ID of the most popular entry with that key, and the number of entries
+    sharing that key, so ambiguous titles can be told apart from unique ones.
+    """
+    magic = b'MTIX'
+    version = 1
+    header = struct.Struct('<4sII')
+    record = struct.Struct('<QII')
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = self.header.unpack_from(self.data, 0)
+        if magic != self.magic or version != self.version:
+            self.data.close()
+            raise ValueError(f'Unrecognized index file: {path}')
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        """Close the memory-mapped index file."""
+        self.data.close()
+
+    def get(self, key: str) -> Optional[tuple[int, int]]:
+        """Look up a key.
+
+        Args:
+            key: Normalized title key.
+
+        Returns:
+            Tuple containing the ID of the most popular entry and the number of entries sharing this key, or None
+            if the key isn't in the index.
+        """
+        target, lo, hi = hash_key(key), 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            h, _id, count = self.record.unpack_from(self.data, self.header.size + mid * self.record.size)
+            if h == target:
+                return _id, count
+            if h < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    @classmethod
+    def build(cls, path: Path, entries: Iterable[tuple[str, int, float]]) -> int:
+        """Write an index file, replacing any existing index once complete.
+
+        Args:
+            path: Path to write the index to.
+            entries: Normalized title key, ID, and popularity of each entry.
+
+        Returns:
+            Number of unique keys written.
+        """
+        keys: dict[int, list] = {}
+        for key, _id, popularity in entries:
+            if not key:
+                continue
+            h = hash_key(key)
+            if (n := keys.get(h)) is None:
+                keys[h] = [_id, popularity, 1]
+                continue
+            n[2] += 1
+            if popularity > n[1]:
+                n[0], n[1] = _id, popularity
+
+        # Write sorted records to a temporary file, then swap it in
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path_tmp = path.with_suffix(path.suffix + '.tmp')
+        with open(path_tmp, 'wb') as f:
+            f.write(cls.header.pack(cls.magic, cls.version, len(keys)))
+            for h in sorted(keys):
+                _id, _, count = keys[h]
+                f.write(cls.record.pack(h, _id, count))
+        os.replace(path_tmp, path)
+        return len(keys)
@@ -0,0 +1,148 @@
+"""
+* Pipeline Utilities
+"""
+# Standard Library Imports
+from queue import Queue
+from threading import Event, Lock, Thread
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+# Third Party Imports
+from omnitils.logs import logger
+
+# Marks the end of a stage's input
+_DONE = object()
+
+"""
+* Classes
+"""
+
+
+class PipelineStage:
+    """A pipeline step which runs a function over its input using a fixed number of worker threads."""
+
+    def __init__(self, name: str, func: Callable[[Any], Optional[Any]], workers: int = 1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+
+        # Stats
+        self.lock = Lock()
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.busy = 0.0
+
+    def record(self, elapsed: float, result: Optional[Any] = None, error: bool = False) -> None:
+        """Record the outcome of processing one item."""
+        with self.lock:
+            self.busy += elapsed
+            if error:
+                self.failed += 1
+            elif result is None:
+                self.dropped += 1
+            else:
+                self.processed += 1
+
+
+class Pipeline:
+    """Runs items through a chain of stages, each stage hands its results to the next through a bounded queue.
+
+    A stage function returning None drops the item, an exception is logged and counted as a failure. If the
+    input items raise, the error is logged and the items read so far still run through the pipeline.
+    """
+
+    def __init__(self, stages: list[PipelineStage], buffer: int = 2):
+        self.stages = stages
+        self.buffer = max(1, buffer)
+        self.count = 0
+        self.elapsed = 0.0
+
+    def run(self, items: Iterable[Any]) -> Iterator[Any]:
+        """Run items through the pipeline, yielding the results of the final stage as they complete.
+
+        Args:
+            items: Input items for the first stage.
+
+        Yields:
+            Results returned by the final stage.
+
+        Note:
+            Closing the generator early stops reading input and discards items still queued, each worker
+            exits once its current item is processed.
+        """
+        start = perf_counter()
+        stopped = Event()
+        queues: list[Queue] = [
+            Queue(maxsize=stage.workers * self.buffer)
+            for stage in self.stages]
+        queues.append(Queue())
+
+        def _feed():
+            """Put each input item into the first stage's queue."""
+            try:
+                for item in items:
+                    if stopped.is_set():
+                        break
+                    self.count += 1
+                    queues[0].put(item)
+            except Exception as e:
+                logger.exception(e)
+            finally:
+                for _ in range(self.stages[0].workers):
+                    queues[0].put(_DONE)
+
+        def _work(i: int, stage: PipelineStage, remaining: list[int]):
+            """Process items for a stage until its input is exhausted."""
+            q_in, q_out = queues[i], queues[i + 1]
+            while (item := q_in.get()) is not _DONE:
+                if stopped.is_set():
+                    continue
+                t = perf_counter()
+                try:
+                    result = stage.func(item)
+                except Exception as e:
+                    logger.exception(e)
+                    stage.record(perf_counter() - t, error=True)
+                    continue
+                stage.record(perf_counter() - t, result)
+                if result is not None:
+                    q_out.put(result)
+
+            # Last worker out signals the next stage
+            with stage.lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    following = self.stages[i + 1].workers if i + 1 < len(self.stages) else 1
+                    for _ in range(following):
+                        q_out.put(_DONE)
+
+        # Start each stage's workers
+        threads = [Thread(target=_feed, daemon=True)]
+        for i, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            threads.extend([
+                Thread(target=_work, args=(i, stage, remaining), daemon=True)
+                for _ in range(stage.workers)])
+        [t.start() for t in threads]
+
+        # Yield final results
+        try:
+            while (result := queues[-1].get()) is not _DONE:
+                yield result
+            [t.join() for t in threads]
+        finally:
+            stopped.set()
+            self.elapsed = perf_counter() - start
+
+    def get_summary(self) -> str:
+        """Returns a summary of pipeline throughput and time spent in each stage."""
+        completed = self.stages[-1].processed if self.stages else 0
+        rate = completed / self.elapsed if self.elapsed else 0
+        lines = [f'Processed {completed}/{self.count} items in {self.elapsed:.2f} seconds ({rate:.2f} items/s)']
+        for stage in self.stages:
+            avg = stage.busy / max(1, stage.processed + stage.dropped + stage.failed)
+            lines.append(
+                f'  {stage.name:<8} workers={stage.workers:<3} ok={stage.processed:<6} '
+                f'dropped={stage.dropped:<6} failed={stage.failed:<6} avg={avg:.3f}s')
+        return '\n'.join(lines)
@@ -0,0 +1,107 @@
+"""
+* Rate Limiting Utilities
+"""
+# Standard Library Imports
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import monotonic, sleep
+from typing import Optional
+
+"""
+* Utilities
+"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header value.
+
+    Args:
+        value: Header value, either a number of seconds or an HTTP date.
+
+    Returns:
+        Number of seconds to wait, or None if the value is missing or malformed.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+"""
+* Classes
+"""
+
+
+class RateLimiter:
+    """A token bucket which slows down when the server throttles requests and speeds back up as they succeed.
+
+    The rate is halved each time a request is throttled and recovers additively with each successful request,
+    never leaving the range between `min_rate` and `max_rate`.
+    """
+
+    def __init__(
+        self,
+        max_rate: float,
+        min_rate: float = 0.5,
+        increase: float = 0.1,
+        decrease: float = 0.5
+    ):
+        self.max_rate = max(max_rate, min_rate)
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.rate = self.max_rate
+        self.throttled_count = 0
+
+        # Bucket state
+        self.lock = Lock()
+        self.capacity = max(1.0, self.max_rate)
+        self.tokens = self.capacity
+        self.updated = monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        """Add tokens earned since the last update at the current rate."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> None:
+        """Block until a request may be made."""
+        while True:
+            with self.lock:
+                now = monotonic()
+                self._refill(now)
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            sleep(wait)
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        """Slow down after the server throttled a request.
+
+        Args:
+            retry_after: Seconds the server asked us to wait before retrying, if provided.
+        """
+        with self.lock:
+            now = monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.tokens = 0
+            self.blocked_until = max(self.blocked_until, now + (retry_after or 1 / self.rate))
+            self.throttled_count += 1
+
+    def succeeded(self) -> None:
+        """Speed back up after a request succeeds."""
+        if self.rate < self.max_rate:
+            with self.lock:
+                self.rate = min(self.max_rate, self.rate + self.increase)
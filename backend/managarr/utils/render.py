@@ -0,0 +1,86 @@
+"""
+* API Response Renderers
+"""
+# Standard Library Imports
+from typing import Any, Optional
+
+# Third Party Imports
+from ninja.renderers import BaseRenderer, JSONRenderer
+from omnitils.logs import logger
+
+# Local Imports
+from managarr import settings
+
+# Optional JSON encoders
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+"""
+* Renderers
+"""
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Renders API responses using orjson."""
+    media_type = 'application/json'
+
+    def render(self, request, data: Any, *, response_status: int) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS, default=encode_default)
+
+
+class MsgspecRenderer(BaseRenderer):
+    """Renders API responses using msgspec."""
+    media_type = 'application/json'
+
+    def __init__(self):
+        self.encoder = msgspec.json.Encoder(enc_hook=encode_default)
+
+    def render(self, request, data: Any, *, response_status: int) -> bytes:
+        return self.encoder.encode(data)
+
+
+# Renderers by name, along with the package they require
+renderers: dict[str, tuple[type[BaseRenderer], Optional[object]]] = {
+    'orjson': (ORJSONRenderer, orjson),
+    'msgspec': (MsgspecRenderer, msgspec),
+    'json': (JSONRenderer, True)
+}
+
+"""
+* Utilities
+"""
+
+
+def encode_default(obj: Any) -> Any:
+    """Converts objects the fast encoders don't support natively, e.g. pydantic models."""
+    if hasattr(obj, 'model_dump'):
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def get_renderer(name: Optional[str] = None) -> BaseRenderer:
+    """Returns the renderer used for API responses.
+
+    Args:
+        name: Renderer to use, e.g. 'orjson', 'msgspec', or 'json'. Uses the configured renderer if not provided.
+
+    Returns:
+        The requested renderer if its package is installed, otherwise the builtin 'json' renderer.
+    """
+    name = name or settings.ENV.get('API', {}).get('RENDERER', 'orjson')
+    if name not in renderers:
+        logger.warning(f"Renderer '{name}' is not supported! Falling back to 'json'.")
+        return JSONRenderer()
+    renderer, package = renderers[name]
+    if not package:
+        logger.warning(f"Renderer '{name}' is not installed! Falling back to 'json'.")
+        return JSONRenderer()
+    return renderer()
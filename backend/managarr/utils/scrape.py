@@ -2,34 +2,163 @@
 * Scraping Utilities
 """
 # Standard Library Imports
-import json
-from typing import Optional
+import re
+from functools import cache
+from threading import Lock
+from typing import Iterator, Optional
 
 # Third Party Imports
-import requests
 import yarl
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
 from omnitils.fetch import request_header_default
+from omnitils.logs import logger
 
+# Local Imports
+from managarr import settings
+from managarr.utils import fetch
+from managarr.utils.cache import PageCache
 
-def get_page_soup(
+# Use orjson for decoding if available
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# Script tag contents
+script_pattern = re.compile(r'<script\b[^>]*>(.*?)</script\s*>', re.S | re.I)
+
+# Escape sequences stripped or replaced when decoding a scraped object string
+unescape_pattern = re.compile(r'\\\\\\"|\\|u0026')
+
+# Page cache, created on first use
+_page_cache: Optional[PageCache] = None
+_page_cache_lock = Lock()
+
+"""
+* Page Cache
+"""
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """Returns the persistent page cache, or None if caching is disabled."""
+    global _page_cache
+    config = settings.ENV.get('PAGE_CACHE', {})
+    if not config.get('ENABLED', True):
+        return None
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageCache(
+                path=settings.BASE_DIR / 'cache' / 'pages.sqlite3',
+                max_size=config.get('MAX_SIZE', 268435456))
+        return _page_cache
+
+
+"""
+* Parsing
+"""
+
+
+@cache
+def get_parser(name: Optional[str] = None) -> str:
+    """Returns the name of an available BeautifulSoup parser backend.
+
+    Args:
+        name: Parser backend to use, e.g. 'lxml' or 'html.parser'. Uses the configured backend if not provided.
+
+    Returns:
+        The requested parser if it is installed, otherwise the builtin 'html.parser'.
+    """
+    name = name or settings.ENV.get('SCRAPE', {}).get('PARSER', 'lxml')
+    try:
+        BeautifulSoup('', name)
+    except FeatureNotFound:
+        logger.warning(f"Parser '{name}' is not installed! Falling back to 'html.parser'.")
+        return 'html.parser'
+    return name
+
+
+def get_soup(
+    html: str,
+    parse_only: Optional[SoupStrainer] = None,
+    parser: Optional[str] = None
+) -> BeautifulSoup:
+    """Get a qualified BeautifulSoup object from page HTML.
+
+    Args:
+        html: HTML content of the page.
+        parse_only: Only build elements matching this strainer, skipping the rest of the page.
+        parser: Parser backend to use, uses the configured backend if not provided.
+
+    Returns:
+        A BeautifulSoup object.
+    """
+    return BeautifulSoup(html, get_parser(parser), parse_only=parse_only)
+
+
+"""
+* Scraping
+"""
+
+
+def get_page_html(
     url: str | yarl.URL,
     header: Optional[dict] = None,
     ignore_status_code: bool = False
-):
-    """Get a qualified BeautifulSoup object from a ThePosterDB page."""
+) -> Optional[str]:
+    """Get the HTML content of a ThePosterDB or Mediux page, revalidating a cached copy if one exists."""
     header = header or request_header_default.copy()
-    with requests.get(url, headers=header) as r:
+    cache = get_page_cache()
 
-        # Load page into BS4
+    # Ask the server to skip the body if the cached copy is current
+    if cache:
+        header.update(cache.get_validators(str(url)))
+    with fetch.get(url, headers=header) as r:
+
+        # Cached copy is current
+        if r.status_code == 304 and cache:
+            if (html := cache.get(str(url))) is not None:
+                return html
+            # Evicted since revalidating
+            header.pop('If-None-Match', None)
+            header.pop('If-Modified-Since', None)
+            return get_page_html(url, header=header, ignore_status_code=ignore_status_code)
+
+        # Return the page content
         if r.status_code == 200 or ignore_status_code:
-            soup = BeautifulSoup(r.text, 'html.parser')
-            return soup
+            etag, last_modified = r.headers.get('ETag'), r.headers.get('Last-Modified')
+            if cache and r.status_code == 200 and (etag or last_modified):
+                cache.set(str(url), r.text, etag=etag, last_modified=last_modified)
+            return r.text
 
         # Unable to retrieve page
         r.raise_for_status()
 
 
+def get_page_soup(
+    url: str | yarl.URL,
+    header: Optional[dict] = None,
+    ignore_status_code: bool = False,
+    parse_only: Optional[SoupStrainer] = None
+):
+    """Get a qualified BeautifulSoup object from a ThePosterDB page."""
+    html = get_page_html(url, header=header, ignore_status_code=ignore_status_code)
+    if html is not None:
+        return get_soup(html, parse_only=parse_only)
+
+
+def iter_scripts(html: str) -> Iterator[str]:
+    """Yield the content of each script tag in page HTML, without parsing the rest of the page.
+
+    Args:
+        html: HTML content of the page.
+
+    Yields:
+        Text content of a script tag.
+    """
+    for match in script_pattern.finditer(html):
+        yield match.group(1)
+
+
 def parse_json_string(input_string: str):
     """Parse an object string from scraped javascript, return a dict.
 
@@ -40,13 +169,10 @@ def parse_json_string(input_string: str):
         A dict representing the scraped object.
     """
 
-    # Format string for parsing
-    st = (input_string
-          .replace('\\\\\\\"', "")
-          .replace("\\", "")
-          .replace("u0026", "&"))
+    # Only the outermost object is decoded
+    index_start, index_end = input_string.find('{'), input_string.rfind('}')
+    data = input_string[index_start:index_end + 1]
 
-    # Parse string into JSON data
-    index_start, index_end = st.find('{'), st.rfind('}')
-    data = st[index_start:index_end + 1]
-    return json.loads(data)
+    # Strip escaped quotes and backslashes and restore ampersands in one pass
+    data = unescape_pattern.sub(lambda m: '&' if m.group() == 'u0026' else '', data)
+    return json_loads(data)
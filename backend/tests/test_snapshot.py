@@ -0,0 +1,171 @@
+"""
+* Tests: Plex Library Snapshot Cache
+"""
+# Standard Library Imports
+import unittest
+from typing import Callable, Optional
+
+# Local Imports
+from managarr.sources.plex.snapshot import Snapshot, SnapshotCache
+
+"""
+* Fakes
+"""
+
+
+class FakeClock:
+    """A clock which only moves when told to."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeListener:
+    """A listener thread which stays alive until stopped."""
+
+    def __init__(self):
+        self.alive = True
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+
+class FakeAlertSource:
+    """An `AlertSource` which pushes alerts to the registered callback on demand."""
+
+    def __init__(self):
+        self.callback: Optional[Callable[[dict], None]] = None
+        self.callback_error: Optional[Callable[[Exception], None]] = None
+        self.listener: Optional[FakeListener] = None
+        self.starts = 0
+        self.down = False
+
+    def startAlertListener(
+        self,
+        callback: Optional[Callable[[dict], None]] = None,
+        callbackError: Optional[Callable[[Exception], None]] = None
+    ) -> FakeListener:
+        self.starts += 1
+        if self.down:
+            raise ConnectionError('Plex server is unreachable')
+        self.callback, self.callback_error = callback, callbackError
+        self.listener = FakeListener()
+        return self.listener
+
+    def push(self, data: dict) -> None:
+        """Deliver an alert to the registered callback."""
+        self.callback(data)
+
+    def fail(self, error: Exception) -> None:
+        """Report an error and stop the listener, like a dropped websocket."""
+        self.listener.alive = False
+        self.callback_error(error)
+
+    @staticmethod
+    def timeline(section_id: int, key: int, item_type: int = 1) -> dict:
+        """Returns a timeline alert for a library item."""
+        return {'type': 'timeline', 'size': 1, 'TimelineEntry': [{
+            'identifier': 'com.plexapp.plugins.library',
+            'sectionID': str(section_id),
+            'itemID': str(key),
+            'type': item_type,
+            'state': 5}]}
+
+    @staticmethod
+    def activity(section_id: int, key: int) -> dict:
+        """Returns an ended activity alert for a library item."""
+        return {'type': 'activity', 'size': 1, 'ActivityNotification': [{
+            'event': 'ended',
+            'Activity': {
+                'type': 'library.refresh.items',
+                'Context': {'key': f'/library/metadata/{key}', 'librarySectionID': str(section_id)}}}]}
+
+
+"""
+* Tests
+"""
+
+
+class TestSnapshotCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.source = FakeAlertSource()
+        self.cache = SnapshotCache(source=self.source, ttl=300, restart_delay=60, clock=self.clock)
+
+        # Starting the listener clears the cache, so start it before anything is cached
+        self.assertTrue(self.cache.start_listener())
+        self.movies = self.cache.get_or_build('Movies', 'movies', lambda: Snapshot(1, [{'id': 11}], keys={11, 12}))
+        self.shows = self.cache.get_or_build('Shows', 'shows', lambda: Snapshot(2, [{'id': 21}], keys={21}))
+        self.sections = self.cache.get_or_build('Shows', 'sections', lambda: Snapshot(2, []))
+
+    def assertCached(self, library: str, kind: str, snapshot: Snapshot) -> None:
+        self.assertIs(self.cache.get(library, kind), snapshot)
+
+    def assertNotCached(self, library: str, kind: str) -> None:
+        self.assertIsNone(self.cache.get(library, kind))
+
+    def test_timeline_invalidates_section(self):
+        """A timeline alert for a ratingKey only drops snapshots of its section."""
+        self.source.push(self.source.timeline(section_id=1, key=11))
+        self.assertNotCached('Movies', 'movies')
+        self.assertCached('Shows', 'shows', self.shows)
+        self.assertCached('Shows', 'sections', self.sections)
+        self.assertEqual(self.cache.stats['invalidated'], 1)
+
+    def test_activity_invalidates_section(self):
+        """An ended activity alert for a ratingKey only drops snapshots of its section."""
+        self.source.push(self.source.activity(section_id=2, key=21))
+        self.assertCached('Movies', 'movies', self.movies)
+        self.assertNotCached('Shows', 'shows')
+        self.assertNotCached('Shows', 'sections')
+        self.assertEqual(self.cache.stats['invalidated'], 2)
+
+    def test_listener_down_falls_back_to_ttl(self):
+        """Snapshots outlive the TTL while listening, and expire after it once the listener fails."""
+        self.clock.now += 1000
+        self.assertCached('Movies', 'movies', self.movies)
+
+        # Snapshots built while the server is unreachable expire once the TTL passes
+        self.source.down = True
+        self.source.fail(ConnectionError('websocket closed'))
+        self.assertFalse(self.cache.listening)
+        movies = self.cache.get_or_build('Movies', 'movies', lambda: Snapshot(1, [{'id': 11}], keys={11, 12}))
+        self.clock.now += 30
+        self.assertCached('Movies', 'movies', movies)
+        self.clock.now += 300
+        self.assertNotCached('Movies', 'movies')
+        self.assertGreater(self.source.starts, 1)
+
+    def test_restart_waits_for_delay(self):
+        """A failed listener is restarted no more than once every `restart_delay` seconds."""
+        self.source.fail(ConnectionError('websocket closed'))
+        self.clock.now += 10
+        self.assertFalse(self.cache.start_listener())
+        self.assertEqual(self.source.starts, 1)
+        self.clock.now += 60
+        self.assertTrue(self.cache.start_listener())
+        self.assertEqual(self.source.starts, 2)
+
+    def test_stale_rebuild_not_cached(self):
+        """A rebuild running when an alert arrives is returned but not cached."""
+        self.source.push(self.source.timeline(section_id=1, key=11))
+
+        def build() -> Snapshot:
+            self.source.push(self.source.timeline(section_id=1, key=12))
+            return Snapshot(1, [{'id': 11, 'stale': True}], keys={11, 12})
+
+        snapshot = self.cache.get_or_build('Movies', 'movies', build)
+        self.assertTrue(snapshot.items[0]['stale'])
+        self.assertNotCached('Movies', 'movies')
+
+        # The next rebuild is cached as usual
+        movies = self.cache.get_or_build('Movies', 'movies', lambda: Snapshot(1, [{'id': 11}], keys={11, 12}))
+        self.assertCached('Movies', 'movies', movies)
+
+
+if __name__ == '__main__':
+    unittest.main()